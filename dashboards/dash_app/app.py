@@ -1,5 +1,10 @@
+import time
+_IMPORT_STARTED = time.perf_counter()           # baseline for the import-to-first-response measurement
+
 import dash
 from dash import dcc, html, Input, Output, callback, dash_table
+from dash.exceptions import PreventUpdate
+from flask import jsonify
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
@@ -13,20 +18,84 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 sys.path.insert(0, project_root)
  
 from src.data_collection import FinancialDataCollector
-from src.data_processing import FinancialDataProcessor
+from src.dashboard_state import DashboardState
+from src.shared_data import SharedDataReader
+from src.instrumentation import CallbackMetrics
+from src.resampling import FREQUENCY_NAMES
+from src.intraday import IntradayStore, INTRADAY_INTERVALS, INTRADAY_NAMES
 from src.config import SECTOR_MAPPING
 
-# Load data
-collector = FinancialDataCollector()
-stock_data = collector.load_stock_data()
-processor = FinancialDataProcessor(stock_data)
+# Startup: 'background' binds the server immediately and loads data in a warm-up thread,
+# 'eager' keeps the old behaviour of loading everything before the server starts
+STARTUP_MODE = os.environ.get('DASHBOARD_STARTUP_MODE', 'background')
+COLLECT_IF_MISSING = os.environ.get('DASHBOARD_COLLECT_IF_MISSING', '1') == '1'
+
+# Multi-worker deployments: publish once with `python -m src.shared_data` and point every
+# worker at the store, so they attach to the same memory-mapped arrays instead of unpickling
+SHARED_DATA_DIR = os.environ.get('DASHBOARD_SHARED_DATA_DIR')
 
-# Prepare data for the app
-master_df = collector.create_master_dataframe(stock_data)
-stock_list = list(stock_data.keys())[:20]  # Limit for performance
+# Minute bars ingested with `python -m src intraday`; the Stock Analysis tab reads only the
+# most recent sessions from disk when an intraday bar frequency is selected
+INTRADAY_DIR = os.environ.get('DASHBOARD_INTRADAY_DIR')
+INTRADAY_SESSIONS = int(os.environ.get('DASHBOARD_INTRADAY_SESSIONS', '5'))
+intraday_stores = {interval: IntradayStore(INTRADAY_DIR, interval) for interval in INTRADAY_INTERVALS}
+
+# Hot reload: every DASHBOARD_RELOAD_INTERVAL seconds (0 disables) check whether a new
+# version was published (or the pickle rewritten) and swap it in without a restart
+RELOAD_INTERVAL = float(os.environ.get('DASHBOARD_RELOAD_INTERVAL', '60'))
+
+RISK_DEFAULT_STOCKS = ['AAPL', 'TSLA', 'NVDA', 'AMD']      # Risk Analysis tab's initial selection, also pre-rendered during warm-up
+
+collector = FinancialDataCollector()
+if SHARED_DATA_DIR:
+    reader = SharedDataReader(SHARED_DATA_DIR)
+    loader, version_probe = reader.attach, reader.current_version
+else:
+    stock_data_path = os.path.join(collector.raw_data_path, 'stock_data.pkl')
+    loader = lambda: collector.load_stock_data(collect_if_missing=COLLECT_IF_MISSING)
+    version_probe = lambda: str(os.stat(stock_data_path).st_mtime_ns) if os.path.exists(stock_data_path) else None
+state = DashboardState(loader, started_at=_IMPORT_STARTED, version_probe=version_probe)
 
 # Initialize Dash app
-app = dash.Dash(__name__)
+app = dash.Dash(__name__, suppress_callback_exceptions=True)
+server = app.server
+
+# Per-callback latency/payload histograms on /metrics; optional JSON-lines log and
+# sampling profiles for callbacks slower than DASHBOARD_PROFILE_SLOW_MS
+metrics = CallbackMetrics(
+    log_path=os.environ.get('DASHBOARD_METRICS_LOG'),
+    profile_slow_ms=float(os.environ['DASHBOARD_PROFILE_SLOW_MS']) if os.environ.get('DASHBOARD_PROFILE_SLOW_MS') else None,
+    profile_dir=os.environ.get('DASHBOARD_PROFILE_DIR')
+)
+metrics.attach(server)
+
+
+@server.route('/healthz')
+def healthz():                      # liveness: the process is up and serving requests
+    return jsonify({'status': 'ok', 'timings_s': state.status()['timings_s']})
+
+
+@server.route('/readyz')
+def readyz():                       # readiness: data is loaded and caches are warm
+    status = state.status()
+    return jsonify(status), (200 if status['ready'] else 503)
+
+
+@server.after_request
+def _record_first_response(response):
+    state.mark_first_response()
+    return response
+
+
+def loading_layout():
+    if state.phase == 'failed':
+        message = f"Market data failed to load: {state.error}"
+    else:
+        message = "Loading market data..."
+    return html.Div([
+        html.H3(message, style={'textAlign': 'center', 'color': '#7f8c8d', 'marginTop': 50})
+    ])
+
 
 # Define the layout
 app.layout = html.Div([
@@ -41,178 +110,200 @@ app.layout = html.Div([
         dcc.Tab(label='Risk Analysis', value='risk'),
     ]),
     
-    html.Div(id='tab-content')
+    html.Div(id='tab-content'),
+
+    # Re-renders the active tab while the warm-up thread is still loading data
+    dcc.Interval(id='warmup-poll', interval=1000, disabled=False)
 ])
 
 # Overview tab layout
-overview_layout = html.Div([
-    html.H2("Market Overview", style={'color': '#34495e'}),
+def overview_layout(snap):
+    return html.Div([
+        html.H2("Market Overview", style={'color': '#34495e'}),
     
-    html.Div([
         html.Div([
-            html.H4("Select Stocks for Comparison:"),
-            dcc.Dropdown(
-                id='overview-stock-dropdown',
-                options=[{'label': ticker, 'value': ticker} for ticker in stock_list],
-                value=['AAPL', 'GOOGL', 'MSFT', 'TSLA'],
-                multi=True
-            )
-        ], style={'width': '48%', 'display': 'inline-block'}),
+            html.Div([
+                html.H4("Select Stocks for Comparison:"),
+                dcc.Dropdown(
+                    id='overview-stock-dropdown',
+                    options=[{'label': ticker, 'value': ticker} for ticker in snap.stock_list],
+                    value=['AAPL', 'GOOGL', 'MSFT', 'TSLA'],
+                    multi=True
+                )
+            ], style={'width': '48%', 'display': 'inline-block'}),
         
+            html.Div([
+                html.H4("Time Range:"),
+                dcc.DatePickerRange(
+                    id='overview-date-picker',
+                    start_date=snap.master_df.index.min(),
+                    end_date=snap.master_df.index.max(),
+                    display_format='YYYY-MM-DD'
+                )
+            ], style={'width': '48%', 'float': 'right', 'display': 'inline-block'})
+        ], style={'marginBottom': 20}),
+    
+        dcc.Graph(id='overview-price-chart'),
+    
         html.Div([
-            html.H4("Time Range:"),
-            dcc.DatePickerRange(
-                id='overview-date-picker',
-                start_date=master_df.index.min(),
-                end_date=master_df.index.max(),
-                display_format='YYYY-MM-DD'
-            )
-        ], style={'width': '48%', 'float': 'right', 'display': 'inline-block'})
-    ], style={'marginBottom': 20}),
-    
-    dcc.Graph(id='overview-price-chart'),
-    
-    html.Div([
-        html.Div([
-            dcc.Graph(id='overview-correlation-heatmap')
-        ], style={'width': '50%', 'display': 'inline-block'}),
+            html.Div([
+                dcc.Graph(id='overview-correlation-heatmap')
+            ], style={'width': '50%', 'display': 'inline-block'}),
         
-        html.Div([
-            dcc.Graph(id='overview-sector-performance')
-        ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+            html.Div([
+                dcc.Graph(id='overview-sector-performance')
+            ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+        ])
     ])
-])
 
 # Stock analysis tab layout
-stock_analysis_layout = html.Div([
-    html.H2("Individual Stock Analysis", style={'color': '#34495e'}),
+def stock_analysis_layout(snap):
+    return html.Div([
+        html.H2("Individual Stock Analysis", style={'color': '#34495e'}),
     
-    html.Div([
         html.Div([
-            html.H4("Select Stock:"),
-            dcc.Dropdown(
-                id='stock-dropdown',
-                options=[{'label': ticker, 'value': ticker} for ticker in stock_list],
-                value='AAPL'
-            )
-        ], style={'width': '30%', 'display': 'inline-block'}),
+            html.Div([
+                html.H4("Select Stock:"),
+                dcc.Dropdown(
+                    id='stock-dropdown',
+                    options=[{'label': ticker, 'value': ticker} for ticker in snap.stock_list],
+                    value='AAPL'
+                )
+            ], style={'width': '30%', 'display': 'inline-block'}),
         
+            html.Div([
+                html.H4("Analysis Period:"),
+                dcc.RadioItems(
+                    id='analysis-period',
+                    options=[
+                        {'label': '3 Months', 'value': 90},
+                        {'label': '6 Months', 'value': 180},
+                        {'label': '1 Year', 'value': 365},
+                        {'label': 'All Time', 'value': 999}
+                    ],
+                    value=365,
+                    inline=True
+                ),
+                html.H4("Bar Frequency:"),
+                dcc.RadioItems(
+                    id='bar-frequency',
+                    options=[{'label': FREQUENCY_NAMES[f], 'value': f} for f in ['D', 'W', 'M']] +
+                            [{'label': INTRADAY_NAMES[i], 'value': i} for i, store in intraday_stores.items() if store.tickers()],
+                    value='D',
+                    inline=True
+                )
+            ], style={'width': '40%', 'float': 'right', 'display': 'inline-block'})
+        ], style={'marginBottom': 20}),
+    
+        # Stock metrics cards
+        html.Div(id='stock-metrics-cards', style={'marginBottom': 20}),
+    
+        dcc.Graph(id='stock-price-volume-chart'),
+    
         html.Div([
-            html.H4("Analysis Period:"),
-            dcc.RadioItems(
-                id='analysis-period',
-                options=[
-                    {'label': '3 Months', 'value': 90},
-                    {'label': '6 Months', 'value': 180},
-                    {'label': '1 Year', 'value': 365},
-                    {'label': 'All Time', 'value': 999}
-                ],
-                value=365,
-                inline=True
-            )
-        ], style={'width': '40%', 'float': 'right', 'display': 'inline-block'})
-    ], style={'marginBottom': 20}),
-    
-    # Stock metrics cards
-    html.Div(id='stock-metrics-cards', style={'marginBottom': 20}),
-    
-    dcc.Graph(id='stock-price-volume-chart'),
-    
-    html.Div([
-        html.Div([
-            dcc.Graph(id='stock-returns-distribution')
-        ], style={'width': '50%', 'display': 'inline-block'}),
+            html.Div([
+                dcc.Graph(id='stock-returns-distribution')
+            ], style={'width': '50%', 'display': 'inline-block'}),
         
-        html.Div([
-            dcc.Graph(id='stock-technical-indicators')
-        ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+            html.Div([
+                dcc.Graph(id='stock-technical-indicators')
+            ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+        ])
     ])
-])
 
 # Portfolio builder tab layout
-portfolio_layout = html.Div([
-    html.H2("Portfolio Builder & Optimizer", style={'color': '#34495e'}),
+def portfolio_layout(snap):
+    return html.Div([
+        html.H2("Portfolio Builder & Optimizer", style={'color': '#34495e'}),
     
-    html.Div([
         html.Div([
-            html.H4("Build Your Portfolio:"),
-            html.Div(id='portfolio-builder')
-        ], style={'width': '48%', 'display': 'inline-block'}),
+            html.Div([
+                html.H4("Build Your Portfolio:"),
+                html.Div(id='portfolio-builder')
+            ], style={'width': '48%', 'display': 'inline-block'}),
         
-        html.Div([
-            html.H4("Portfolio Metrics:"),
-            html.Div(id='portfolio-metrics')
-        ], style={'width': '48%', 'float': 'right', 'display': 'inline-block'})
-    ], style={'marginBottom': 20}),
+            html.Div([
+                html.H4("Portfolio Metrics:"),
+                html.Div(id='portfolio-metrics')
+            ], style={'width': '48%', 'float': 'right', 'display': 'inline-block'})
+        ], style={'marginBottom': 20}),
     
-    dcc.Graph(id='portfolio-performance-chart'),
+        dcc.Graph(id='portfolio-performance-chart'),
     
-    html.Div([
         html.Div([
-            dcc.Graph(id='portfolio-allocation-pie')
-        ], style={'width': '50%', 'display': 'inline-block'}),
+            html.Div([
+                dcc.Graph(id='portfolio-allocation-pie')
+            ], style={'width': '50%', 'display': 'inline-block'}),
         
-        html.Div([
-            dcc.Graph(id='efficient-frontier')
-        ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+            html.Div([
+                dcc.Graph(id='efficient-frontier')
+            ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+        ])
     ])
-])
 
 # Risk analysis tab layout
-risk_analysis_layout = html.Div([
-    html.H2("Risk Analysis Dashboard", style={'color': '#34495e'}),
+def risk_analysis_layout(snap):
+    return html.Div([
+        html.H2("Risk Analysis Dashboard", style={'color': '#34495e'}),
     
-    html.Div([
         html.Div([
-            html.H4("Select Stocks for Risk Analysis:"),
-            dcc.Dropdown(
-                id='risk-stock-dropdown',
-                options=[{'label': ticker, 'value': ticker} for ticker in stock_list],
-                value=['AAPL', 'TSLA', 'NVDA', 'AMD'],
-                multi=True
-            )
-        ], style={'width': '60%', 'display': 'inline-block'}),
+            html.Div([
+                html.H4("Select Stocks for Risk Analysis:"),
+                dcc.Dropdown(
+                    id='risk-stock-dropdown',
+                    options=[{'label': ticker, 'value': ticker} for ticker in snap.stock_list],
+                    value=RISK_DEFAULT_STOCKS,
+                    multi=True
+                )
+            ], style={'width': '60%', 'display': 'inline-block'}),
         
+            html.Div([
+                html.H4("Risk Metric:"),
+                dcc.RadioItems(
+                    id='risk-metric',
+                    options=[
+                        {'label': 'Volatility', 'value': 'volatility'},
+                        {'label': 'VaR 95%', 'value': 'var_95'},
+                        {'label': 'Max Drawdown', 'value': 'max_drawdown'}
+                    ],
+                    value='volatility',
+                    inline=True
+                )
+            ], style={'width': '35%', 'float': 'right', 'display': 'inline-block'})
+        ], style={'marginBottom': 20}),
+    
+        dcc.Graph(id='risk-return-scatter'),
+    
         html.Div([
-            html.H4("Risk Metric:"),
-            dcc.RadioItems(
-                id='risk-metric',
-                options=[
-                    {'label': 'Volatility', 'value': 'volatility'},
-                    {'label': 'VaR 95%', 'value': 'var_95'},
-                    {'label': 'Max Drawdown', 'value': 'max_drawdown'}
-                ],
-                value='volatility',
-                inline=True
-            )
-        ], style={'width': '35%', 'float': 'right', 'display': 'inline-block'})
-    ], style={'marginBottom': 20}),
-    
-    dcc.Graph(id='risk-return-scatter'),
-    
-    html.Div([
-        html.Div([
-            dcc.Graph(id='volatility-clustering')
-        ], style={'width': '50%', 'display': 'inline-block'}),
+            html.Div([
+                dcc.Graph(id='volatility-clustering')
+            ], style={'width': '50%', 'display': 'inline-block'}),
         
-        html.Div([
-            dcc.Graph(id='risk-metrics-table')
-        ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+            html.Div([
+                dcc.Graph(id='risk-metrics-table')
+            ], style={'width': '50%', 'float': 'right', 'display': 'inline-block'})
+        ])
     ])
-])
 
 # Callback for tab content
-@app.callback(Output('tab-content', 'children'),
-              Input('main-tabs', 'value'))
-def render_content(tab):
+@app.callback([Output('tab-content', 'children'),
+               Output('warmup-poll', 'disabled')],
+              [Input('main-tabs', 'value'),
+               Input('warmup-poll', 'n_intervals')])
+@metrics.instrument('render_content')
+def render_content(tab, n_intervals):
+    snap = state.snapshot()
+    if snap is None:
+        return loading_layout(), state.phase == 'failed'      # keep polling until the warm-up finishes
+
     if tab == 'overview':
-        return overview_layout
+        return overview_layout(snap), True
     elif tab == 'stocks':
-        return stock_analysis_layout
+        return stock_analysis_layout(snap), True
     elif tab == 'portfolio':
-        return portfolio_layout
+        return portfolio_layout(snap), True
     elif tab == 'risk':
-        return risk_analysis_layout
+        return risk_analysis_layout(snap), True
 
 # Overview callbacks
 @app.callback(
@@ -223,9 +314,15 @@ def render_content(tab):
      Input('overview-date-picker', 'start_date'),
      Input('overview-date-picker', 'end_date')]
 )
+@metrics.instrument('update_overview_charts')
 def update_overview_charts(selected_stocks, start_date, end_date):
+    snap = state.snapshot()
+    if snap is None:
+        raise PreventUpdate
+    stock_data, processor = snap.stock_data, snap.processor
+
     # Filter data
-    filtered_df = master_df.loc[start_date:end_date, selected_stocks]
+    filtered_df = snap.master_df.loc[start_date:end_date, selected_stocks]
     
     # Normalize prices
     normalized_df = filtered_df / filtered_df.iloc[0] * 100
@@ -259,26 +356,14 @@ def update_overview_charts(selected_stocks, start_date, end_date):
     ))
     corr_fig.update_layout(title='Stock Correlation Matrix')
     
-    # Sector performance
-    sector_performance = []
-    for sector, tickers in SECTOR_MAPPING.items():
-        sector_stocks = [t for t in tickers if t in selected_stocks]
-        if sector_stocks:
-            sector_returns = []
-            for ticker in sector_stocks:
-                if ticker in stock_data:
-                    returns = stock_data[ticker]['prices']['Returns'].dropna()
-                    annual_return = returns.mean() * 252 * 100
-                    sector_returns.append(annual_return)
-            
-            if sector_returns:
-                sector_performance.append({
-                    'Sector': sector,
-                    'Average_Return': np.mean(sector_returns),
-                    'Count': len(sector_returns)
-                })
-    
-    sector_df = pd.DataFrame(sector_performance)
+    # Sector performance over the selected date range, straight from the range index
+    ticker_stats = processor.build_ticker_stats()
+    selected_stats = processor.range_stats(selected_stocks, start_date, end_date)
+    selected_stats['sector'] = ticker_stats['sector']
+    sector_df = (selected_stats.groupby('sector')['annual_return']
+                 .agg(Average_Return=lambda r: r.mean() * 100, Count='count')
+                 .reindex(list(SECTOR_MAPPING.keys())).dropna()
+                 .rename_axis('Sector').reset_index())
     sector_fig = px.bar(sector_df, x='Sector', y='Average_Return',
                        title='Average Sector Performance')
     
@@ -291,9 +376,16 @@ def update_overview_charts(selected_stocks, start_date, end_date):
      Output('stock-returns-distribution', 'figure'),
      Output('stock-technical-indicators', 'figure')],
     [Input('stock-dropdown', 'value'),
-     Input('analysis-period', 'value')]
+     Input('analysis-period', 'value'),
+     Input('bar-frequency', 'value')]
 )
-def update_stock_analysis(selected_stock, period_days):
+@metrics.instrument('update_stock_analysis')
+def update_stock_analysis(selected_stock, period_days, bar_frequency='D'):
+    snap = state.snapshot()
+    if snap is None:
+        raise PreventUpdate
+    stock_data, processor = snap.stock_data, snap.processor
+
     if selected_stock not in stock_data:
         return [], {}, {}, {}
     
@@ -304,9 +396,10 @@ def update_stock_analysis(selected_stock, period_days):
     
     # Calculate metrics
     returns = prices['Returns'].dropna() * 100
-    annual_return = returns.mean() * 252
-    annual_volatility = returns.std() * np.sqrt(252)
-    sharpe_ratio = annual_return / annual_volatility if annual_volatility != 0 else 0
+    period_stats = processor.range_stats([selected_stock], last_rows=period_days if period_days < 999 else None).iloc[0]
+    annual_return = period_stats['annual_return'] * 100
+    annual_volatility = period_stats['annual_volatility'] * 100
+    sharpe_ratio = period_stats['sharpe_ratio']
     
     # Metrics cards
     metrics_cards = html.Div([
@@ -332,7 +425,18 @@ def update_stock_analysis(selected_stock, period_days):
                                          'borderRadius': '5px', 'textAlign': 'center'})
     ])
     
-    # Price and volume chart
+    # Price and volume chart, optionally on pre-aggregated weekly/monthly bars or recent intraday sessions
+    bars = prices
+    bar_name = FREQUENCY_NAMES['D']
+    if bar_frequency in INTRADAY_INTERVALS:
+        intraday = intraday_stores[bar_frequency].read_sessions(selected_stock, INTRADAY_SESSIONS)
+        if len(intraday):
+            bars, bar_name = intraday, INTRADAY_NAMES[bar_frequency]
+    elif bar_frequency and bar_frequency != 'D':
+        bars = snap.resampler.ticker_bars(selected_stock, bar_frequency)
+        bars = bars[bars.index >= prices.index[0]]
+        bar_name = FREQUENCY_NAMES[bar_frequency]
+
     price_volume_fig = make_subplots(
         rows=2, cols=1,
         shared_xaxes=True,
@@ -342,16 +446,16 @@ def update_stock_analysis(selected_stock, period_days):
     )
     
     price_volume_fig.add_trace(
-        go.Scatter(x=prices.index, y=prices['Close'], name='Price', line=dict(width=2)),
+        go.Scatter(x=bars.index, y=bars['Close'], name='Price', line=dict(width=2)),
         row=1, col=1
     )
     
     price_volume_fig.add_trace(
-        go.Bar(x=prices.index, y=prices['Volume'], name='Volume', marker_color='lightblue'),
+        go.Bar(x=bars.index, y=bars['Volume'], name='Volume', marker_color='lightblue'),
         row=2, col=1
     )
     
-    price_volume_fig.update_layout(title=f'{selected_stock} - Price and Volume Analysis')
+    price_volume_fig.update_layout(title=f'{selected_stock} - {bar_name} Price and Volume Analysis')
     
     # Returns distribution
     returns_fig = go.Figure()
@@ -380,9 +484,12 @@ def update_stock_analysis(selected_stock, period_days):
      Output('efficient-frontier', 'figure')],
     [Input('main-tabs', 'value')]  # Trigger on tab change
 )
+@metrics.instrument('update_portfolio_tab')
 def update_portfolio_tab(tab_value):
-    if tab_value != 'portfolio':
+    snap = state.snapshot()
+    if tab_value != 'portfolio' or snap is None:
         return [], [], {}, {}, {}
+    processor = snap.processor
     
     # Default portfolio
     default_stocks = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA']
@@ -408,13 +515,16 @@ def update_portfolio_tab(tab_value):
     
     # Calculate portfolio metrics
     portfolio_metrics_calc = processor.calculate_portfolio_metrics(default_stocks, default_weights)
+    factor_risk = processor.factor_portfolio_risk(default_stocks, default_weights)
     
     portfolio_metrics = html.Div([
         html.P(f"Annual Return: {portfolio_metrics_calc['annual_return']:.2%}"),
         html.P(f"Annual Volatility: {portfolio_metrics_calc['annual_volatility']:.2%}"),
         html.P(f"Sharpe Ratio: {portfolio_metrics_calc['sharpe_ratio']:.2f}"),
         html.P(f"Total Return: {portfolio_metrics_calc['total_return']:.2%}"),
-        html.P(f"Max Drawdown: {portfolio_metrics_calc['max_drawdown']:.2%}")
+        html.P(f"Max Drawdown: {portfolio_metrics_calc['max_drawdown']:.2%}"),
+        html.P(f"Factor-Model Volatility: {factor_risk['annual_volatility']:.2%} "
+               f"({factor_risk['systematic_share']:.0%} systematic)")
     ])
     
     # Portfolio performance chart
@@ -448,6 +558,16 @@ def update_portfolio_tab(tab_value):
         marker=dict(size=10, color='red'),
         name='Current Portfolio'
     ))
+    stats = processor.build_ticker_stats()            # individual stocks, with factor-model risk on the x axis
+    factor_vol = processor.fit_factor_model().total_risk
+    efficient_frontier_fig.add_trace(go.Scatter(
+        x=factor_vol.values,
+        y=stats['annual_return'].reindex(factor_vol.index).values,
+        mode='markers',
+        text=factor_vol.index,
+        marker=dict(size=6, color='steelblue', opacity=0.6),
+        name='Stocks'
+    ))
     efficient_frontier_fig.update_layout(
         title='Efficient Frontier',
         xaxis_title='Volatility',
@@ -464,25 +584,29 @@ def update_portfolio_tab(tab_value):
     [Input('risk-stock-dropdown', 'value'),
      Input('risk-metric', 'value')]
 )
+@metrics.instrument('update_risk_analysis')
 def update_risk_analysis(selected_stocks, risk_metric):
+    snap = state.snapshot()
+    if snap is None:
+        raise PreventUpdate
+
     if not selected_stocks:
         return {}, {}, {}
-    
+    return build_risk_figures(snap, selected_stocks)
+
+
+def build_risk_figures(snap, selected_stocks):
+    stock_data, processor = snap.stock_data, snap.processor
+    selected_stocks = [t for t in selected_stocks if t in stock_data]
+    if not selected_stocks:
+        return {}, {}, {}
+
     # Risk-return scatter
-    risk_return_data = []
-    for ticker in selected_stocks:
-        if ticker in stock_data:
-            returns = stock_data[ticker]['prices']['Returns'].dropna()
-            annual_return = returns.mean() * 252 * 100
-            annual_volatility = returns.std() * np.sqrt(252) * 100
-            
-            risk_return_data.append({
-                'Stock': ticker,
-                'Return': annual_return,
-                'Volatility': annual_volatility
-            })
-    
-    rr_df = pd.DataFrame(risk_return_data)
+    ticker_stats = processor.build_ticker_stats()
+    rr_df = (ticker_stats.loc[[t for t in selected_stocks if t in ticker_stats.index],
+                              ['annual_return', 'annual_volatility']] * 100)
+    rr_df = rr_df.rename(columns={'annual_return': 'Return', 'annual_volatility': 'Volatility'})
+    rr_df = rr_df.rename_axis('Stock').reset_index()
     
     scatter_fig = px.scatter(
         rr_df, x='Volatility', y='Return',
@@ -498,19 +622,27 @@ def update_risk_analysis(selected_stocks, risk_metric):
     vol_fig = make_subplots(rows=2, cols=1, shared_xaxes=True)
     vol_fig.add_trace(go.Scatter(x=returns.index, y=returns, name='Returns'), row=1, col=1)
     vol_fig.add_trace(go.Scatter(x=rolling_vol.index, y=rolling_vol, name='Rolling Vol'), row=2, col=1)
+
+    # GARCH(1,1) conditional volatility from parameters fitted during warm-up
+    for ticker in selected_stocks:
+        garch_vol, forecast = processor.garch_volatility(ticker, horizon=10 if ticker == first_stock else 0)
+        vol_fig.add_trace(go.Scatter(x=garch_vol.index, y=garch_vol, name=f'{ticker} GARCH Vol'), row=2, col=1)
+        if len(forecast):
+            forecast_index = pd.bdate_range(garch_vol.index[-1], periods=len(forecast) + 1)[1:]
+            vol_fig.add_trace(go.Scatter(x=forecast_index, y=forecast, name=f'{ticker} GARCH Forecast',
+                                         line=dict(dash='dash')), row=2, col=1)
     vol_fig.update_layout(title=f'{first_stock} - Volatility Clustering')
     
     # Risk metrics table
     risk_data = []
     for stock in selected_stocks:
-        if stock in stock_data:
-            risk_metrics = processor.calculate_risk_metrics(stock)
-            risk_data.append({
-                'Stock': stock,
-                'Volatility': f"{risk_metrics.get('volatility', 0)*100:.1f}%",
-                'VaR 95%': f"{risk_metrics.get('var_95', 0)*100:.2f}%",
-                'Max Loss': f"{risk_metrics.get('max_daily_loss', 0)*100:.2f}%"
-            })
+        risk_metrics = processor.calculate_risk_metrics(stock)
+        risk_data.append({
+            'Stock': stock,
+            'Volatility': f"{risk_metrics.get('volatility', 0)*100:.1f}%",
+            'VaR 95%': f"{risk_metrics.get('var_95', 0)*100:.2f}%",
+            'Max Loss': f"{risk_metrics.get('max_daily_loss', 0)*100:.2f}%"
+        })
     
     risk_table_fig = go.Figure(data=[go.Table(
         header=dict(values=list(risk_data[0].keys())),
@@ -520,7 +652,22 @@ def update_risk_analysis(selected_stocks, risk_metric):
     
     return scatter_fig, vol_fig, risk_table_fig
 
+# Build the default Risk Analysis figures during warm-up: the first GARCH recursion and the
+# first plotly express figure carry one-time import and template costs
+def warm_risk_figures(snap):        # the tab's defaults, or the first listed stocks when none of them are in this universe
+    build_risk_figures(snap, [t for t in RISK_DEFAULT_STOCKS if t in snap.stock_data] or snap.stock_list[:4])
+
+
+state.warmers.append(warm_risk_figures)
+
+if STARTUP_MODE == 'eager':
+    state.load()
+else:
+    state.start_warmup()
+if RELOAD_INTERVAL > 0:
+    state.start_watcher(RELOAD_INTERVAL)
+
 if __name__ == '__main__':
-    app.run_server(debug=True, port=8050)
+    app.run(debug=True, port=8050)
 
 # change the directory to dash_app and run app.py. Check the portal http://127.0.0.1:8050/ for the visualization
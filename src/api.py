@@ -0,0 +1,374 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dashboard_state import DashboardState, DataSnapshot
+
+# Read-only analytics over the same snapshot the dashboard uses:
+#   GET /prices               long rows (Date, Ticker, fields...)     ?tickers= &fields= &start= &end=
+#   GET /returns              wide daily returns (Date x tickers)     ?tickers= &start= &end=
+#   GET /risk                 window statistics + VaR/CVaR per ticker ?tickers= &start= &end=
+#   GET /correlations         return correlation matrix               ?tickers= &start= &end= &method=sample|factor
+#   GET /sector-performance   equal-weighted sector statistics        ?start= &end=
+# Bodies are Arrow IPC streams (?format=arrow or Accept: ARROW_MEDIA_TYPE) or JSON records,
+# gzip-encoded when the client accepts it. The ETag is derived from the data version and the
+# normalized query, so If-None-Match is answered with 304 before any compute. Encoded bodies
+# are kept in a byte-bounded LRU, and identical requests that arrive together share one
+# computation. Compute and encoding run in a thread pool; the event loop only does I/O.
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_MEDIA_TYPE = 'application/json'
+DEFAULT_PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+LOAD_TEST_PATHS = ['/prices?tickers=AAPL,MSFT,GOOGL&fields=Close,Volume', '/returns?start=2024-01-01',
+                   '/risk', '/correlations?method=factor', '/sector-performance']
+
+
+class QueryError(ValueError):       # bad query parameters; reported to the client as 400
+    pass
+
+
+def _require_aiohttp():
+    try:
+        from aiohttp import web
+    except ImportError as e:
+        raise ImportError("The analytics API requires aiohttp: pip install aiohttp") from e
+    return web
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Arrow responses require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+
+def _date(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value).isoformat()
+    except ValueError:
+        raise QueryError(f"Invalid date: {value}")
+
+
+def parse_query(snap: DataSnapshot, endpoint: str, params) -> Dict:     # validated, normalized query; also the cache key
+
+    tickers = _split(params.get('tickers'))
+    unknown = [t for t in tickers if t not in snap.panel.tickers]
+    if unknown:
+        raise QueryError(f"Unknown tickers: {', '.join(unknown)}")
+    fields = _split(params.get('fields'))
+    unknown = [f for f in fields if f not in snap.panel.fields]
+    if unknown:
+        raise QueryError(f"Unknown fields: {', '.join(unknown)}, expected some of {', '.join(snap.panel.fields)}")
+
+    query = {'tickers': tickers, 'start': _date(params.get('start')), 'end': _date(params.get('end'))}
+    if endpoint == 'prices':
+        query['fields'] = fields or [f for f in DEFAULT_PRICE_FIELDS if f in snap.panel.fields]
+    if endpoint == 'correlations':
+        query['method'] = params.get('method', 'sample')
+        if query['method'] not in ('sample', 'factor'):
+            raise QueryError(f"Unknown method: {query['method']}, expected sample or factor")
+    return query
+
+
+def prices_frame(snap: DataSnapshot, query: Dict) -> pd.DataFrame:     # observed bars only, ticker-major
+
+    panel = snap.panel
+    tickers = query['tickers'] or panel.tickers
+    i, j = snap.processor.range_index.locate(query['start'], query['end'])
+    positions = {t: k for k, t in enumerate(panel.tickers)}
+    columns = [positions[t] for t in tickers]
+    mask = panel.observed[i:j][:, columns].T.ravel()           # (ticker, date) flattened
+
+    frame = pd.DataFrame({
+        'Date': panel.dates[np.tile(np.arange(i, j), len(tickers))[mask]],
+        'Ticker': pd.Categorical(np.repeat(tickers, j - i)[mask], categories=tickers)
+    })
+    for field in query['fields']:
+        values = panel.field(field)[i:j][:, columns].T.ravel()[mask]
+        if field == 'Volume' and not np.isnan(values).any():      # the panel stores every field as float
+            values = values.astype('int64')
+        frame[field] = values
+    return frame
+
+
+def returns_frame(snap: DataSnapshot, query: Dict) -> pd.DataFrame:
+    i, j = snap.processor.range_index.locate(query['start'], query['end'])
+    returns = snap.panel.field_frame('Returns', query['tickers'] or None).iloc[i:j]
+    return returns.dropna(how='all').rename_axis('Date').reset_index()
+
+
+def risk_frame(snap: DataSnapshot, query: Dict) -> pd.DataFrame:
+    risk = snap.processor.calculate_risk_table(query['tickers'] or None, query['start'], query['end'])
+    return risk.rename_axis('Ticker').reset_index()
+
+
+def correlations_frame(snap: DataSnapshot, query: Dict) -> pd.DataFrame:      # the factor method uses the model's trailing window
+    if query['method'] == 'factor':
+        matrix = snap.processor.fit_factor_model().correlation(query['tickers'] or None)
+    else:
+        matrix = snap.processor.calculate_correlation_matrix(query['tickers'] or None, query['start'], query['end'])
+    return matrix.rename_axis('Ticker').reset_index()
+
+
+def sector_frame(snap: DataSnapshot, query: Dict) -> pd.DataFrame:
+    performance = snap.processor.calculate_sector_performance(query['start'], query['end'])
+    rows = {sector: {k: v for k, v in metrics.items() if k != 'returns'} for sector, metrics in performance.items()}
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis('Sector').reset_index()
+
+
+ENDPOINTS: Dict[str, Callable[[DataSnapshot, Dict], pd.DataFrame]] = {
+    'prices': prices_frame,
+    'returns': returns_frame,
+    'risk': risk_frame,
+    'correlations': correlations_frame,
+    'sector-performance': sector_frame
+}
+
+
+def encode_frame(frame: pd.DataFrame, fmt: str) -> bytes:      # Arrow IPC stream, or gzip-compressed JSON records
+
+    if fmt == 'arrow':
+        pa = _require_pyarrow()
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    body = frame.to_json(orient='records', date_format='iso').encode()
+    return gzip.compress(body, compresslevel=5)
+
+
+class ResponseCache:                # LRU of encoded bodies, bounded by total size
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self.nbytes -= len(self._entries.pop(key))
+        self._entries[key] = body
+        self.nbytes += len(body)
+        while self.nbytes > self.max_bytes:
+            self.nbytes -= len(self._entries.popitem(last=False)[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AnalyticsAPI:                 # aiohttp handlers over a DashboardState, compute offloaded to a thread pool
+
+    def __init__(self, state: DashboardState, max_workers: int = None, cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.state = state
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api-worker')    # numpy/pandas release the GIL in the heavy parts
+        self.cache = ResponseCache(cache_bytes)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counters = {'requests': 0, 'not_modified': 0, 'cache_hits': 0, 'computed': 0, 'errors': 0}
+
+    @staticmethod
+    def _format(request) -> str:
+        fmt = request.query.get('format')
+        if fmt is None:
+            fmt = 'arrow' if ARROW_MEDIA_TYPE in request.headers.get('Accept', '') else 'json'
+        if fmt not in ('arrow', 'json'):
+            raise QueryError(f"Unknown format: {fmt}, expected arrow or json")
+        return fmt
+
+    @staticmethod
+    def _etag(version: str, endpoint: str, query: Dict, fmt: str) -> str:
+        key = json.dumps([version, endpoint, query, fmt], sort_keys=True)
+        return f'"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+    async def handle(self, request):
+
+        web = _require_aiohttp()
+        self.counters['requests'] += 1
+        snap = self.state.snapshot()                # read once; a hot swap mid-request does not mix versions
+        if snap is None:
+            return web.json_response({'error': 'data not loaded', 'phase': self.state.phase}, status=503)
+
+        endpoint = request.match_info['endpoint']
+        try:
+            fmt = self._format(request)
+            query = parse_query(snap, endpoint, request.query)
+        except QueryError as e:
+            self.counters['errors'] += 1
+            return web.json_response({'error': str(e)}, status=400)
+
+        etag = self._etag(snap.version, endpoint, query, fmt)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept, Accept-Encoding',
+                   'X-Data-Version': snap.version}
+        if etag in request.headers.get('If-None-Match', '') or request.headers.get('If-None-Match') == '*':
+            self.counters['not_modified'] += 1
+            return web.Response(status=304, headers=headers)
+
+        body = self.cache.get(etag)
+        if body is None:
+            body = await self._render(etag, snap, endpoint, query, fmt)
+        else:
+            self.counters['cache_hits'] += 1
+
+        if fmt == 'json':
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                headers['Content-Encoding'] = 'gzip'
+            else:
+                body = gzip.decompress(body)
+        return web.Response(body=body, headers=headers, content_type=ARROW_MEDIA_TYPE if fmt == 'arrow' else JSON_MEDIA_TYPE)
+
+    async def _render(self, etag: str, snap: DataSnapshot, endpoint: str, query: Dict, fmt: str) -> bytes:    # one computation per key in flight
+
+        future = self._inflight.get(etag)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self._compute, snap, endpoint, query, fmt)
+            self._inflight[etag] = future
+            try:
+                body = await asyncio.shield(future)       # a client hanging up must not cancel the shared work
+                self.cache.put(etag, body)
+                self.counters['computed'] += 1
+                return body
+            finally:
+                self._inflight.pop(etag, None)
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _compute(snap: DataSnapshot, endpoint: str, query: Dict, fmt: str) -> bytes:
+        return encode_frame(ENDPOINTS[endpoint](snap, query), fmt)
+
+    async def readyz(self, request):
+        web = _require_aiohttp()
+        status = self.state.status()
+        status['api'] = dict(self.counters, cache_entries=len(self.cache), cache_bytes=self.cache.nbytes)
+        return web.json_response(status, status=200 if self.state.ready else 503)
+
+    async def healthz(self, request):
+        web = _require_aiohttp()
+        return web.json_response({'status': 'ok'})
+
+    def make_app(self):
+
+        web = _require_aiohttp()
+        app = web.Application()
+        app.router.add_get('/healthz', self.healthz)
+        app.router.add_get('/readyz', self.readyz)
+        app.router.add_get('/{endpoint:' + '|'.join(ENDPOINTS) + '}', self.handle)
+
+        async def _shutdown(app):
+            self.state.stop_watcher()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        app.on_cleanup.append(_shutdown)
+        return app
+
+
+def build_state(shared_dir: str = None) -> DashboardState:     # same data sources and version probes as the Dash app
+
+    if shared_dir:
+        from .shared_data import SharedDataReader
+
+        reader = SharedDataReader(shared_dir)
+        return DashboardState(reader.attach, version_probe=reader.current_version)
+
+    from .data_collection import FinancialDataCollector
+
+    collector = FinancialDataCollector()
+    stock_data_path = os.path.join(collector.raw_data_path, 'stock_data.pkl')
+    loader = lambda: collector.load_stock_data(collect_if_missing=False)      # never crawl Yahoo from a request server
+    version_probe = lambda: str(os.stat(stock_data_path).st_mtime_ns) if os.path.exists(stock_data_path) else None
+    return DashboardState(loader, version_probe=version_probe)
+
+
+def serve(host: str = '127.0.0.1', port: int = 8060, shared_dir: str = None, max_workers: int = None,
+          cache_bytes: int = DEFAULT_CACHE_BYTES, reload_interval: float = 60):
+
+    web = _require_aiohttp()
+    state = build_state(shared_dir)
+    state.start_warmup()                        # bind immediately; data endpoints return 503 until ready
+    if reload_interval:
+        state.start_watcher(reload_interval)
+    api = AnalyticsAPI(state, max_workers, cache_bytes)
+    print(f"Analytics API on http://{host}:{port} ({', '.join('/' + e for e in ENDPOINTS)})")
+    web.run_app(api.make_app(), host=host, port=port, print=None)
+
+
+async def _load_test(base_url: str, paths: List[str], concurrency: int, total: int, fmt: str,
+                     revalidate: bool) -> Tuple[List[float], Dict[int, int], int, float]:
+
+    import aiohttp
+
+    latencies, statuses, received = [], {}, 0
+    etags: Dict[str, str] = {}
+    headers = {'Accept': ARROW_MEDIA_TYPE if fmt == 'arrow' else JSON_MEDIA_TYPE, 'Accept-Encoding': 'gzip'}
+    counter = iter(range(total))
+
+    async def worker(session):
+        nonlocal received
+        for n in counter:
+            path = paths[n % len(paths)]
+            request_headers = dict(headers, **({'If-None-Match': etags[path]} if revalidate and path in etags else {}))
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + path, headers=request_headers, auto_decompress=False) as response:
+                    body = await response.read()
+                    if 'ETag' in response.headers:
+                        etags[path] = response.headers['ETag']
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+                    received += len(body)
+            except aiohttp.ClientError:
+                statuses[0] = statuses.get(0, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*[worker(session) for _ in range(concurrency)])
+    return latencies, statuses, received, time.perf_counter() - started
+
+
+def run_load_test(base_url: str = 'http://127.0.0.1:8060', paths: List[str] = None, concurrency: int = 32,
+                  requests: int = 2000, fmt: str = 'arrow', revalidate: bool = False) -> Dict:    # closed-loop load against a running API
+
+    _require_aiohttp()
+    paths = paths or LOAD_TEST_PATHS
+    latencies, statuses, received, elapsed = asyncio.run(
+        _load_test(base_url.rstrip('/'), paths, concurrency, requests, fmt, revalidate))
+    ms = np.array(latencies) * 1000
+    result = {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'statuses': statuses,
+        'megabytes': received / 1e6
+    }
+    print(f"{result['requests']} requests in {elapsed:.2f}s ({result['requests_per_second']:.0f} req/s, "
+          f"concurrency {concurrency}): p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+          f"p99 {result['p99_ms']:.1f} ms, statuses {statuses}, {result['megabytes']:.1f} MB")
+    return result
@@ -0,0 +1,234 @@
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import SECTOR_MAPPING, PROCESSED_DATA_DIR
+
+# Star schema: one daily fact table keyed by (ticker, date_key) with the sector key
+# denormalised onto it so that (sector, date) range scans hit an index as well.
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS dim_date (
+        date_key INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        month_name TEXT NOT NULL,
+        day_of_week INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS dim_sector (
+        sector_key INTEGER PRIMARY KEY,
+        sector TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS dim_company (
+        ticker TEXT PRIMARY KEY,
+        company_name TEXT,
+        sector_key INTEGER REFERENCES dim_sector (sector_key),
+        industry TEXT,
+        market_cap_billions DOUBLE,
+        employee_count BIGINT,
+        country TEXT,
+        website TEXT,
+        business_summary TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS fact_daily_bar (
+        ticker TEXT NOT NULL,
+        date_key INTEGER NOT NULL,
+        sector_key INTEGER NOT NULL,
+        open DOUBLE,
+        high DOUBLE,
+        low DOUBLE,
+        close DOUBLE,
+        volume BIGINT,
+        daily_return DOUBLE,
+        volatility DOUBLE,
+        ma_20 DOUBLE,
+        ma_50 DOUBLE,
+        rsi DOUBLE,
+        PRIMARY KEY (ticker, date_key)
+    )"""
+]
+
+# Created after the bulk load; building a b-tree once is far cheaper than maintaining it row by row
+INDEXES = [
+    "DROP INDEX IF EXISTS idx_fact_ticker_date",        # duplicated the (ticker, date_key) primary key; removed from older files
+    "CREATE INDEX IF NOT EXISTS idx_fact_sector_date ON fact_daily_bar (sector_key, date_key)",
+    "CREATE INDEX IF NOT EXISTS idx_fact_date ON fact_daily_bar (date_key)"
+]
+
+VIEWS = {
+    'v_sector_performance': """
+        SELECT s.sector,
+               COUNT(*) AS stock_count,
+               SUM(c.market_cap_billions) AS total_market_cap_billions,
+               AVG(t.annual_return_pct) AS avg_annual_return_pct,
+               SUM(t.avg_volume) AS total_avg_volume
+        FROM (
+            SELECT ticker, sector_key, AVG(daily_return) * 252 * 100 AS annual_return_pct, AVG(volume) AS avg_volume
+            FROM fact_daily_bar
+            GROUP BY ticker, sector_key
+        ) t
+        JOIN dim_sector s ON s.sector_key = t.sector_key
+        JOIN dim_company c ON c.ticker = t.ticker
+        GROUP BY s.sector
+    """,
+    'v_monthly_performance': """
+        SELECT m.ticker,
+               d.year,
+               d.month,
+               d.month_name,
+               printf('%04d-%02d', d.year, d.month) AS year_month,
+               f.close AS month_end_price,
+               (f.close / LAG(f.close) OVER (PARTITION BY m.ticker ORDER BY m.date_key) - 1) * 100 AS monthly_return_pct
+        FROM (
+            SELECT f.ticker, MAX(f.date_key) AS date_key
+            FROM fact_daily_bar f
+            JOIN dim_date d ON d.date_key = f.date_key
+            GROUP BY f.ticker, d.year, d.month
+        ) m
+        JOIN fact_daily_bar f ON f.ticker = m.ticker AND f.date_key = m.date_key
+        JOIN dim_date d ON d.date_key = m.date_key
+    """
+}
+
+FACT_COLUMNS = ['ticker', 'date_key', 'sector_key', 'open', 'high', 'low', 'close', 'volume',
+                'daily_return', 'volatility', 'ma_20', 'ma_50', 'rsi']
+PRICE_FIELDS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'daily_return': 'Returns',
+                'volatility': 'Volatility', 'ma_20': 'MA_20', 'ma_50': 'MA_50', 'rsi': 'RSI'}
+
+
+def _sector_for(ticker: str) -> str:
+    for sector, tickers in SECTOR_MAPPING.items():
+        if ticker in tickers:
+            return sector
+    return 'Other'
+
+
+def _date_keys(index) -> np.ndarray:            # yyyymmdd integers, the fact/date join key
+    index = pd.DatetimeIndex(index)
+    return (index.year * 10000 + index.month * 100 + index.day).to_numpy(dtype='int64')
+
+
+class BIWarehouse:                  # embedded analytical database (SQLite, or DuckDB when installed) for BI queries
+
+    def __init__(self, path: str = None, engine: str = 'sqlite'):
+        self.engine = engine
+        self.path = path or os.path.join(PROCESSED_DATA_DIR, f"bi_warehouse.{'duckdb' if engine == 'duckdb' else 'db'}")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        if engine == 'duckdb':
+            try:
+                import duckdb
+            except ImportError as e:
+                raise ImportError("The duckdb engine requires duckdb: pip install duckdb") from e
+            self.conn = duckdb.connect(self.path)
+        elif engine == 'sqlite':
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        else:
+            raise ValueError(f"Unknown engine: {engine}")
+
+    def create_schema(self):
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        for name, sql in VIEWS.items():
+            self.conn.execute(f"DROP VIEW IF EXISTS {name}")
+            self.conn.execute(f"CREATE VIEW {name} AS {sql}")
+
+    def load(self, stock_data: Dict, batch_size: int = 50_000) -> int:     # (re)load dimensions and upsert the daily facts
+
+        started = time.perf_counter()
+        self.create_schema()
+
+        sector_keys = {sector: i + 1 for i, sector in enumerate(list(SECTOR_MAPPING.keys()) + ['Other'])}
+        self._upsert('dim_sector', ['sector_key', 'sector'], [(k, s) for s, k in sector_keys.items()])
+        self._upsert('dim_company', ['ticker', 'company_name', 'sector_key', 'industry', 'market_cap_billions',
+                                     'employee_count', 'country', 'website', 'business_summary'],
+                     [self._company_row(t, d, sector_keys) for t, d in stock_data.items()])
+
+        date_keys = np.unique(np.concatenate([_date_keys(data['prices'].index) for data in stock_data.values()]))
+        all_dates = pd.to_datetime(date_keys.astype(str), format='%Y%m%d')
+        self._upsert('dim_date', ['date_key', 'date', 'year', 'quarter', 'month', 'month_name', 'day_of_week'],
+                     list(zip(_date_keys(all_dates).tolist(), all_dates.strftime('%Y-%m-%d'), all_dates.year.tolist(),
+                              all_dates.quarter.tolist(), all_dates.month.tolist(), all_dates.strftime('%B'),
+                              all_dates.dayofweek.tolist())))
+
+        rows = 0
+        for batch in self._fact_batches(stock_data, sector_keys, batch_size):
+            rows += self._append_facts(batch)
+
+        for statement in INDEXES:
+            self.conn.execute(statement)
+        self.conn.commit()
+        if self.engine == 'sqlite':
+            self.conn.execute("ANALYZE")
+        print(f"Loaded {rows} fact rows into {self.path} in {time.perf_counter() - started:.2f}s")
+        return rows
+
+    @staticmethod
+    def _company_row(ticker: str, data: Dict, sector_keys: Dict[str, int]) -> Tuple:
+        info = data.get('info', {})
+        return (ticker, info.get('longName', ticker), sector_keys[_sector_for(ticker)], info.get('industry', 'Unknown'),
+                (info.get('marketCap') or 0) / 1e9, info.get('fullTimeEmployees', 0), info.get('country', 'Unknown'),
+                info.get('website', ''), (info.get('longBusinessSummary') or '')[:200])
+
+    @staticmethod
+    def _fact_batches(stock_data: Dict, sector_keys: Dict[str, int], batch_size: int) -> Iterator[pd.DataFrame]:
+
+        pending, pending_rows = [], 0
+        for ticker, data in stock_data.items():
+            prices = data['prices']
+            frame = pd.DataFrame({'ticker': ticker, 'date_key': _date_keys(prices.index),
+                                  'sector_key': sector_keys[_sector_for(ticker)]})
+            for column, field in PRICE_FIELDS.items():
+                frame[column] = prices[field].to_numpy(dtype='float64') if field in prices else np.nan
+            frame['volume'] = prices['Volume'].round().astype('Int64').to_numpy()     # nullable: panel round-trips pad missing bars with NaN
+            pending.append(frame[FACT_COLUMNS])
+            pending_rows += len(frame)
+            if pending_rows >= batch_size:
+                yield pd.concat(pending, ignore_index=True)
+                pending, pending_rows = [], 0
+        if pending:
+            yield pd.concat(pending, ignore_index=True)
+
+    def _append_facts(self, batch: pd.DataFrame) -> int:
+
+        if self.engine == 'duckdb':                 # native columnar append straight from the DataFrame
+            self.conn.register('fact_batch', batch)
+            self.conn.execute(f"INSERT OR REPLACE INTO fact_daily_bar SELECT {', '.join(FACT_COLUMNS)} FROM fact_batch")
+            self.conn.unregister('fact_batch')
+        else:
+            columns = [batch[c].astype(object).where(batch[c].notna(), None).tolist() for c in FACT_COLUMNS]     # plain Python scalars / None for sqlite3
+            self._upsert('fact_daily_bar', FACT_COLUMNS, zip(*columns))
+        return len(batch)
+
+    def _upsert(self, table: str, columns: List[str], rows):
+        placeholders = ', '.join('?' for _ in columns)
+        self.conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                              list(rows))
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        return self.conn.execute(sql, params).fetchall()
+
+    def ticker_history(self, ticker: str, start: str, end: str) -> List[Tuple]:        # typical dashboard lookup
+        return self.query(
+            "SELECT d.date, f.close, f.volume, f.daily_return FROM fact_daily_bar f "
+            "JOIN dim_date d ON d.date_key = f.date_key "
+            "WHERE f.ticker = ? AND f.date_key BETWEEN ? AND ? ORDER BY f.date_key",
+            (ticker, int(start.replace('-', '')), int(end.replace('-', '')))
+        )
+
+    def sector_daily_returns(self, sector: str, start: str, end: str) -> List[Tuple]:  # equal-weighted sector return series
+        return self.query(
+            "SELECT f.date_key, AVG(f.daily_return) FROM fact_daily_bar f "
+            "JOIN dim_sector s ON s.sector_key = f.sector_key "
+            "WHERE s.sector = ? AND f.date_key BETWEEN ? AND ? GROUP BY f.date_key ORDER BY f.date_key",
+            (sector, int(start.replace('-', '')), int(end.replace('-', '')))
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+# Modules covered by `bench`, and dependencies none of them may pull in at import time
+BENCH_MODULES = ['config', 'data_collection', 'data_processing', 'visualization_utils', 'export_for_bi',
+                 'dashboard_state', 'shared_data', 'resampling', 'bi_warehouse', 'instrumentation', 'panel', 'intraday', 'refresh', 'range_stats',
+                 'factor_model', 'api']
+LAZY_DEPENDENCIES = ['yfinance', 'matplotlib', 'seaborn', 'scipy', 'duckdb', 'dash', 'plotly', 'aiohttp']
+DEFAULT_IMPORT_BUDGET_MS = 100.0             # on top of numpy + pandas; every module adds < 30 ms, an eager matplotlib ~400 ms
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DASH_APP_PATH = os.path.join(PROJECT_ROOT, 'dashboards', 'dash_app', 'app.py')
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import numpy, pandas
+baseline = time.perf_counter()
+import src.{module}
+finished = time.perf_counter()
+print(json.dumps({{'seconds': finished - baseline, 'baseline': baseline - started,
+                  'loaded': [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 3) -> Dict:      # cold import in fresh interpreters from an empty working directory
+
+    # numpy and pandas are imported first in the same interpreter, so 'ms' is this package's own
+    # cost on top of them; 'baseline_ms' is what they took and mostly tracks how busy the machine is
+    best, baseline, loaded, side_effects = None, None, [], []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+            env.pop('MARKET_DATA_DIR', None)
+            result = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(module=module, lazy=LAZY_DEPENDENCIES)],
+                                    cwd=cwd, env=env, capture_output=True, text=True, check=True)
+            probe = json.loads(result.stdout.strip().splitlines()[-1])
+            side_effects = os.listdir(cwd)
+        best = probe['seconds'] if best is None else min(best, probe['seconds'])
+        baseline = probe['baseline'] if baseline is None else min(baseline, probe['baseline'])
+        loaded = probe['loaded']
+    return {'module': module, 'ms': best * 1000, 'baseline_ms': baseline * 1000, 'loaded': loaded, 'created': side_effects}
+
+
+def cmd_collect(args):
+    from .data_collection import FinancialDataCollector
+
+    tickers = args.tickers or None
+    FinancialDataCollector(tickers).collect_stock_data(period=args.period)
+
+
+def cmd_intraday(args):        # minute bars into the chunked on-disk store
+    from .intraday import IntradayStore, ingest_intraday
+
+    ingest_intraday(args.tickers or None, args.interval, args.period, IntradayStore(args.store_dir, args.interval))
+
+
+def cmd_refresh(args):          # re-collect and publish a new shared-data version for the dashboard workers
+    from .data_collection import FinancialDataCollector
+    from .shared_data import SharedDataPublisher
+
+    publisher = SharedDataPublisher(args.shared_dir)
+    collect = lambda: FinancialDataCollector().collect_stock_data(period=args.period)
+    if not args.daemon:
+        publisher.publish(collect())
+        return
+
+    import asyncio
+    from .refresh import RefreshScheduler
+
+    scheduler = RefreshScheduler(publisher, collect, settle_minutes=args.settle_minutes,
+                                 jitter_seconds=args.jitter_seconds)
+    asyncio.run(scheduler.run(run_now=args.now))
+
+
+def cmd_export(args):
+    from .export_for_bi import export_data_for_bi
+
+    export_data_for_bi(args.format, args.output_dir, args.database, args.database_path, args.frequencies)
+
+
+def cmd_serve(args):            # run the Dash app; it resolves the same data root as collect/refresh via src.config
+    import runpy
+
+    os.environ['DASHBOARD_STARTUP_MODE'] = args.startup
+    if args.shared_dir:
+        os.environ['DASHBOARD_SHARED_DATA_DIR'] = os.path.abspath(args.shared_dir)
+    namespace = runpy.run_path(DASH_APP_PATH, run_name='dash_app')
+    namespace['app'].run(host=args.host, port=args.port, debug=args.debug)
+
+
+def cmd_api(args):              # read-only analytics HTTP API (Arrow IPC / gzip JSON)
+    from .api import serve
+
+    serve(args.host, args.port, args.shared_dir, args.workers, int(args.cache_mb * 1024 * 1024), args.reload_interval)
+
+
+def cmd_loadtest(args):         # drive a running API with concurrent clients and report throughput and latency
+    from .api import run_load_test
+
+    run_load_test(args.url, args.paths or None, args.concurrency, args.requests, args.format, args.revalidate)
+
+
+def cmd_bench(args) -> int:     # enforce the cold-start budget; nonzero exit status when any module exceeds it
+
+    modules = args.modules or BENCH_MODULES
+    unknown = sorted(set(modules) - set(BENCH_MODULES))
+    if unknown:
+        print(f"Unknown modules: {', '.join(unknown)}")
+        return 2
+
+    failures = 0
+    for module in modules:
+        result = measure_import(module, args.repeat)
+        problems = []
+        if result['ms'] > args.budget_ms:
+            problems.append(f"over budget ({args.budget_ms:.0f} ms)")
+        if result['loaded']:
+            problems.append(f"eagerly imports {', '.join(result['loaded'])}")
+        if result['created']:
+            problems.append(f"creates {', '.join(result['created'])} on import")
+        failures += bool(problems)
+        print(f"{'FAIL' if problems else 'ok  '} src.{module:<22} {result['ms']:8.1f} ms "
+              f"(+{result['baseline_ms']:.0f} ms numpy/pandas)  {'; '.join(problems)}")
+
+    print(f"{failures} of {len(modules)} modules failed the import budget")
+    return 1 if failures else 0
+
+
+def add_export_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:     # shared with `python -m src.export_for_bi`
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--output-dir', default=None, help="defaults to PROCESSED_DATA_DIR")
+    parser.add_argument('--database', choices=['sqlite', 'duckdb'], default=None,
+                        help="also load an embedded star-schema database")
+    parser.add_argument('--database-path', default=None)
+    parser.add_argument('--frequencies', nargs='*', choices=['W', 'M', 'Q', 'Y'], default=None,
+                        help="also export OHLCV bars at these frequencies")
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:     # stdlib only, so `--help` stays instant
+
+    parser = argparse.ArgumentParser(prog='python -m src', description="Financial market analysis toolkit")
+    parser.add_argument('--data-dir', default=None, help="data root, overrides MARKET_DATA_DIR (default data/ in the repository)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    collect = commands.add_parser('collect', help="download prices and company info from Yahoo Finance")
+    collect.add_argument('--period', default='2y')
+    collect.add_argument('--tickers', nargs='*', default=None)
+    collect.set_defaults(handler=cmd_collect)
+
+    intraday = commands.add_parser('intraday', help="ingest 1-minute or 5-minute bars into the intraday store")
+    intraday.add_argument('--interval', choices=['1m', '5m'], default='1m')
+    intraday.add_argument('--period', default=None, help="defaults to the longest period Yahoo serves for the interval")
+    intraday.add_argument('--tickers', nargs='*', default=None)
+    intraday.add_argument('--store-dir', default=None)
+    intraday.set_defaults(handler=cmd_intraday)
+
+    refresh = commands.add_parser('refresh', help="collect fresh data and publish it to the shared store")
+    refresh.add_argument('--period', default='2y')
+    refresh.add_argument('--shared-dir', default=None)
+    refresh.add_argument('--daemon', action='store_true', help="keep running and refresh after every market close")
+    refresh.add_argument('--now', action='store_true', help="with --daemon, also refresh once at startup")
+    refresh.add_argument('--settle-minutes', type=float, default=30, help="wait this long after the close")
+    refresh.add_argument('--jitter-seconds', type=float, default=300)
+    refresh.set_defaults(handler=cmd_refresh)
+
+    export = add_export_arguments(commands.add_parser('export', help="write the BI export tables"))
+    export.set_defaults(handler=cmd_export)
+
+    serve = commands.add_parser('serve', help="run the Dash dashboard")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8050)
+    serve.add_argument('--startup', choices=['background', 'eager'], default='background')
+    serve.add_argument('--shared-dir', default=None, help="attach to a published shared-data store")
+    serve.add_argument('--debug', action='store_true')
+    serve.set_defaults(handler=cmd_serve)
+
+    api = commands.add_parser('api', help="run the read-only analytics HTTP API")
+    api.add_argument('--host', default='127.0.0.1')
+    api.add_argument('--port', type=int, default=8060)
+    api.add_argument('--shared-dir', default=None, help="attach to a published shared-data store")
+    api.add_argument('--workers', type=int, default=None, help="compute threads (default: Python's ThreadPoolExecutor default)")
+    api.add_argument('--cache-mb', type=float, default=64, help="response cache size")
+    api.add_argument('--reload-interval', type=float, default=60, help="seconds between data-version checks, 0 disables")
+    api.set_defaults(handler=cmd_api)
+
+    loadtest = commands.add_parser('loadtest', help="load-test a running analytics API")
+    loadtest.add_argument('--url', default='http://127.0.0.1:8060')
+    loadtest.add_argument('--concurrency', type=int, default=32)
+    loadtest.add_argument('--requests', type=int, default=2000)
+    loadtest.add_argument('--format', choices=['arrow', 'json'], default='arrow')
+    loadtest.add_argument('--revalidate', action='store_true', help="send If-None-Match with the last ETag seen per path")
+    loadtest.add_argument('paths', nargs='*', metavar='path', help="request paths, e.g. '/risk?tickers=AAPL' (default: a mix of all endpoints)")
+    loadtest.set_defaults(handler=cmd_loadtest)
+
+    bench = commands.add_parser('bench', help="measure cold import time of the src modules against a budget")
+    bench.add_argument('--budget-ms', type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.add_argument('modules', nargs='*', metavar='module', help=f"subset of: {', '.join(BENCH_MODULES)}")
+    bench.set_defaults(handler=cmd_bench)
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+
+    args = build_parser().parse_args(argv)
+    if args.data_dir:                   # must be set before any handler imports src.config
+        os.environ['MARKET_DATA_DIR'] = args.data_dir
+    return args.handler(args) or 0
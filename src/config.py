@@ -23,13 +23,17 @@ SECTOR_MAPPING = {
     'Consumer Staples': ['PEP', 'KO', 'PM']
 }
 
-DATA_DIR = 'data'
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_DIR = os.path.abspath(os.environ.get('MARKET_DATA_DIR', os.path.join(PROJECT_ROOT, 'data')))     # one absolute root for every entry point
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')    
 EXTERNAL_DATA_DIR = os.path.join(DATA_DIR, 'external')
 
-for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, EXTERNAL_DATA_DIR]:
+
+def ensure_dir(directory: str) -> str:          # create a data directory on first write rather than at import time
     os.makedirs(directory, exist_ok=True)
+    return directory
+
 
 PLOT_STYLE = 'seaborn-v0_8'
 COLOR_PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
@@ -0,0 +1,180 @@
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Union
+
+from .data_collection import compute_data_version
+from .data_processing import FinancialDataProcessor
+from .panel import PricePanel
+from .shared_data import SharedDataset
+from .resampling import ResamplingEngine
+
+
+class DataSnapshot:                 # immutable bundle of everything the dashboard callbacks read
+
+    def __init__(self, source: Union[Dict, PricePanel], stock_list_limit: int = 20, previous: 'DataSnapshot' = None):
+        if isinstance(source, PricePanel):            # e.g. a SharedDataset: zero-copy frames over the memory-mapped store
+            panel = source
+            stock_data = source.to_stock_data()
+            self.version = source.version if isinstance(source, SharedDataset) else compute_data_version(stock_data)
+        else:                                           # keep only the panel: per-ticker frames become views into it
+            self.version = compute_data_version(source)
+            panel = PricePanel.from_stock_data(source)
+            stock_data = panel.to_stock_data()
+
+        self.panel = panel                      # every wide frame below is a view into this one array
+        self.master_df = panel.field_frame('Close')
+        self.resampler = ResamplingEngine.from_panel(panel)
+        if previous is not None:                # a refresh that only appended dates re-aggregates just the open periods
+            self.resampler = previous.resampler.extend(self.resampler.daily) or self.resampler
+        self.stock_data = stock_data
+        self.processor = FinancialDataProcessor(stock_data, panel)
+        if previous is not None:
+            self.processor.roll_factor_models(previous.processor)
+        self.stock_list = list(stock_data.keys())[:stock_list_limit]       # limit for performance
+        self.loaded_at = time.time()
+
+    def warm(self):                 # precompute anything the first callbacks would otherwise pay for
+        self.processor.calculate_correlation_matrix(self.stock_list)
+        self.processor.build_ticker_stats()                 # also builds the range-statistics index
+        self.processor.fit_factor_model()
+        self.processor.fit_garch_models('garch')           # loads persisted params for this data version when present
+        for freq in ['W', 'M']:                             # coarse bars offered by the Stock Analysis tab
+            self.resampler.get(freq)
+
+
+class DashboardState:               # owns the current snapshot and loads it off the request path
+
+    def __init__(self, loader: Callable[[], Union[Dict, PricePanel]], started_at: float = None, stock_list_limit: int = 20,
+                 version_probe: Callable[[], Optional[str]] = None, warmers: List[Callable[[DataSnapshot], None]] = None):
+        self._loader = loader
+        self._stock_list_limit = stock_list_limit
+        self._version_probe = version_probe     # cheap token (published version, file mtime) that changes with the data
+        self._loaded_token: Optional[str] = None
+        self.warmers = list(warmers or [])          # app-side warm-up (e.g. default figures) run on every new snapshot
+        self._snapshot: Optional[DataSnapshot] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.phase = 'idle'                 # idle -> loading -> warming -> ready | failed
+        self.error: Optional[str] = None
+        self.reloads = 0
+        self.timings: Dict[str, float] = {'started_at': started_at if started_at is not None else time.perf_counter()}
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def snapshot(self) -> Optional[DataSnapshot]:       # callbacks read this once per request
+        return self._snapshot
+
+    def load(self) -> DataSnapshot:         # load synchronously in the calling thread (eager startup)
+
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            try:
+                self.phase = 'loading'
+                self._loaded_token = self._probe()          # taken first, so data published mid-load triggers a reload
+                source = self._loader()
+                self._mark('data_loaded')
+
+                self.phase = 'warming'
+                snapshot = self._build(source)
+                self._mark('caches_warm')
+
+                self._snapshot = snapshot
+                self.phase = 'ready'
+                return snapshot
+            except Exception as e:
+                self.phase = 'failed'
+                self.error = f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+                raise
+
+    def _build(self, source: Union[Dict, PricePanel], previous: DataSnapshot = None) -> DataSnapshot:
+        snapshot = DataSnapshot(source, self._stock_list_limit, previous)
+        snapshot.warm()
+        for warmer in self.warmers:
+            warmer(snapshot)
+        return snapshot
+
+    def _probe(self) -> Optional[str]:
+        try:
+            return self._version_probe() if self._version_probe else None
+        except Exception:
+            return None
+
+    def has_update(self) -> bool:
+        token = self._probe()
+        return self._snapshot is not None and token is not None and token != self._loaded_token
+
+    def reload(self) -> Optional[DataSnapshot]:     # build and warm a new snapshot beside the live one, then swap the reference
+
+        with self._lock:
+            started = time.perf_counter()
+            token = self._probe()
+            try:
+                snapshot = self._build(self._loader(), self._snapshot)
+            except Exception as e:                  # keep serving the previous snapshot
+                self.error = f"reload failed: {type(e).__name__}: {e}"
+                traceback.print_exc()
+                return None
+
+            previous = self._snapshot
+            self._snapshot = snapshot               # in-flight callbacks keep the snapshot they already read
+            self._loaded_token = token
+            self.reloads += 1
+            self.error = None
+            self.timings['last_reload'] = time.perf_counter() - started
+            print(f"Dashboard data swapped to version {snapshot.version} "
+                  f"(was {previous.version if previous else None}) in {self.timings['last_reload']:.2f}s")
+            return snapshot
+
+    def start_watcher(self, interval: float = 60) -> threading.Thread:     # poll the version probe and hot-swap new data
+
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), name='dashboard-reloader', daemon=True)
+            self._watcher.start()
+        return self._watcher
+
+    def stop_watcher(self):
+        self._stop_watching.set()
+
+    def _watch(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            if self.has_update():
+                self.reload()
+
+    def start_warmup(self) -> threading.Thread:         # load in a daemon thread so the server can bind immediately
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._warmup, name='dashboard-warmup', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _warmup(self):
+        try:
+            self.load()
+            print(f"Dashboard data ready in {self.timings['caches_warm']:.2f}s")
+        except Exception:
+            pass                                # already recorded in self.error for the readiness endpoint
+
+    def mark_first_response(self):          # import-to-first-response latency, recorded once
+        if 'first_response' not in self.timings:
+            self._mark('first_response')
+
+    def _mark(self, name: str):
+        self.timings[name] = time.perf_counter() - self.timings['started_at']
+
+    def status(self) -> Dict:
+        return {
+            'ready': self.ready,
+            'phase': self.phase,
+            'error': self.error,
+            'timings_s': {k: round(v, 4) for k, v in self.timings.items() if k != 'started_at'},
+            'tickers': len(self._snapshot.stock_data) if self._snapshot else 0,
+            'version': self._snapshot.version if self._snapshot else None,
+            'reloads': self.reloads
+        }
@@ -1,10 +1,10 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import os
 import pickle
+import hashlib
 from typing import Dict, List, Optional
-from config import SP500_TOP_50, RAW_DATA_DIR, START_DATE, END_DATE, SECTOR_MAPPING
+from .config import SP500_TOP_50, RAW_DATA_DIR, START_DATE, END_DATE, SECTOR_MAPPING, ensure_dir
 
 class FinancialDataCollector:               # collect and manage financial data
     
@@ -15,6 +15,8 @@ class FinancialDataCollector:               # collect and manage financial data
 
     def collect_stock_data(self, period: str = "2y", save_data: bool = True) -> Dict:           # collect stock price data for specific tickers
 
+        import yfinance as yf                       # network client, only needed when actually collecting
+
         print(f"Collecting data for {len(self.tickers)} stocks...")
         stock_data = {}
 
@@ -27,11 +29,7 @@ class FinancialDataCollector:               # collect and manage financial data
 
                 info = stock.info                           # get company info
 
-                hist['Returns'] = hist['Close'].pct_change()
-                hist['Volatility'] = hist['Returns'].rolling(window=30).std()
-                hist['MA_20'] = hist['Close'].rolling(window=20).mean()
-                hist['MA_50'] = hist['Close'].rolling(window=50).mean()
-                hist['RSI'] = self._calculate_rsi(hist['Close'])
+                add_technical_indicators(hist)
 
                 stock_data[ticker] = {
                     'prices': hist,
@@ -50,15 +48,7 @@ class FinancialDataCollector:               # collect and manage financial data
     
 
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:     # Calculate RSI
-
-        delta = prices.diff()
-        gain = (delta.where(delta>0, 0)).rolling(window = period).mean()
-        loss = (-delta.where(delta <0, 0)).rolling(window=period).mean()
-
-        rs = gain/loss
-        rsi = 100 - (100/(1+rs))
-
-        return rsi
+        return calculate_rsi(prices, period)
 
 
     def _get_sector(self, ticker: str) -> str:              # get sector for a given ticker
@@ -71,12 +61,12 @@ class FinancialDataCollector:               # collect and manage financial data
     
     def _save_stock_data(self, data: Dict):         # save stock data to pickle file
 
-        filepath = os.path.join(self.raw_data_path, 'stock_data.pkl')
+        filepath = os.path.join(ensure_dir(self.raw_data_path), 'stock_data.pkl')
         with open(filepath, 'wb') as f:
             pickle.dump(data, f)
         print(f"Data saved to {filepath}")
 
-    def load_stock_data(self) -> Dict:              # load stock data from pickle file
+    def load_stock_data(self, collect_if_missing: bool = True) -> Dict:     # load stock data from pickle file
 
         filepath = os.path.join(self.raw_data_path, 'stock_data.pkl')
         try:
@@ -85,12 +75,15 @@ class FinancialDataCollector:               # collect and manage financial data
             print(f"Data loaded from {filepath}")
             return data
         except FileNotFoundError:
+            if not collect_if_missing:                  # callers on a latency-sensitive path opt out of the network crawl
+                raise
             print("No saved data found. Collecting fresh data...")
             return self.collect_stock_data()
 
 
     def get_market_data(self) -> pd.DataFrame:          # get market indices data
 
+        import yfinance as yf
         market_indices = ['^GSPC', '^DJI', '^IXIC', '^VIX']
         market_data = {}
 
@@ -107,15 +100,40 @@ class FinancialDataCollector:               # collect and manage financial data
 
     def create_master_dataframe(self, stock_data: Dict) -> pd.DataFrame:        # create a master dataframe with all stock prices
 
-        price_data = {}
-        
-        for ticker, data in stock_data.items():
-            if 'prices' in data:
-                price_data[ticker] = data['prices']['Close']
+        from .panel import PricePanel
 
-        df = pd.DataFrame(price_data)
-        df.index = pd.to_datetime(df.index)
-        return df
-    
-    
-        
+        return PricePanel.from_stock_data(stock_data, ['Close']).field_frame('Close')
+
+
+def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
+
+    delta = prices.diff()
+    gain = (delta.where(delta>0, 0)).rolling(window = period).mean()
+    loss = (-delta.where(delta <0, 0)).rolling(window=period).mean()
+
+    rs = gain/loss
+    rsi = 100 - (100/(1+rs))
+
+    return rsi
+
+
+def add_technical_indicators(hist: pd.DataFrame) -> pd.DataFrame:      # Returns/Volatility/MA/RSI columns on daily bars, in place
+
+    hist['Returns'] = hist['Close'].pct_change()
+    hist['Volatility'] = hist['Returns'].rolling(window=30).std()
+    hist['MA_20'] = hist['Close'].rolling(window=20).mean()
+    hist['MA_50'] = hist['Close'].rolling(window=50).mean()
+    hist['RSI'] = calculate_rsi(hist['Close'])
+    return hist
+
+
+def compute_data_version(stock_data: Dict) -> str:         # content fingerprint used to key caches and published datasets
+
+    digest = hashlib.sha1()
+    for ticker in sorted(stock_data):
+        prices = stock_data[ticker].get('prices')
+        digest.update(ticker.encode())
+        if prices is not None and len(prices):
+            digest.update(str(prices.index[-1]).encode())
+            digest.update(prices['Close'].to_numpy(dtype='float64').tobytes())
+    return digest.hexdigest()[:12]
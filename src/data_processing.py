@@ -1,28 +1,43 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
-from config import PROCESSED_DATA_DIR
+from concurrent.futures import ProcessPoolExecutor
+from .config import PROCESSED_DATA_DIR, SECTOR_MAPPING, ensure_dir
+from .data_collection import compute_data_version
+from .factor_model import FactorModel
+from .panel import PricePanel
+from .range_stats import RangeStatsIndex
 import os
+import uuid
+import warnings
+
+PERIOD_RETURN_WINDOWS = {'3m': 63, '6m': 126, '1y': 252}       # trading days behind the 3M/6M/1Y period returns
+ANALYSIS_PERIODS = [90, 180, 365, 999]                          # dashboard 'analysis-period' options (rows, 999 = all time)
+GARCH_MODELS = {'garch': ['omega', 'alpha', 'beta'], 'gjr': ['omega', 'alpha', 'gamma', 'beta']}
+GARCH_SCALE = 100                                               # fit on percent returns for better conditioning
+FACTOR_WINDOW = 252                                             # trading days of returns behind the factor model
 
 class FinancialDataProcessor:           # process and analyze financial data
 
-    def __init__(self, stock_data: Dict):
+    def __init__(self, stock_data: Dict, panel: PricePanel = None):
         self.stock_data = stock_data
+        self._panel = panel
         self.processed_data_path = PROCESSED_DATA_DIR
+        self._ticker_stats = None
+        self._range_index = None
+        self._data_version = None
+        self._garch_params = {}
+        self._factor_models = {}
     
     def calculate_portfolio_metrics(self, tickers: List[str], weights: List[float] = None) -> Dict:     # calculate portfolio performance metrics
 
         if weights is None:
             weights = [1/len(tickers)] * len(tickers)
 
-        returns_data = {}
-        for ticker in tickers:
-            if ticker in self.stock_data:
-                returns_data[ticker] = self.stock_data[ticker]['prices']['Returns'].dropna()
-        
-        returns_df = pd.DataFrame 
+        weights = pd.Series(weights, index=tickers, dtype='float64')
+        returns_df = self.panel.field_frame('Returns', tickers).dropna(how='all')
 
-        portfolio_returns = (returns_df * weights).sum(axis=1)      # portfolio returns
+        portfolio_returns = (returns_df * weights[returns_df.columns]).sum(axis=1)      # portfolio returns
 
         metrics = {                                                 # calculate metrics
             'annual_return': portfolio_returns.mean() * 252,
@@ -42,39 +57,23 @@ class FinancialDataProcessor:           # process and analyze financial data
         drawdown = (cumulative - running_max)/running_max
         return drawdown.min()
     
-    def calculate_correlation_matrix(self, tickers: List[str] = None) -> pd.DataFrame:  # calculate correlation matrix for stock returns
-
-        if tickers is None:
-            tickers = list(self.stock_data.keys()) 
-
-        returns_data = {}
-
-        for ticker in tickers:
-            if ticker in self.stock_data:
-                returns_data[ticker] = self.stock_data[ticker]['prices']['Returns']
+    def calculate_correlation_matrix(self, tickers: List[str] = None, start=None, end=None) -> pd.DataFrame:  # calculate correlation matrix for stock returns
 
-        returns_df = pd.DataFrame(returns_data)
+        returns_df = self._window(self.panel.field_frame('Returns', tickers), start, end)
         correlation_matrix = returns_df.corr()
         
         return correlation_matrix
     
 
-    def calculate_sector_performance(self) -> pd.DataFrame:     # calculate sector-wise performance metrics
-
-        from .config import SECTOR_MAPPING
+    def calculate_sector_performance(self, start=None, end=None) -> pd.DataFrame:     # calculate sector-wise performance metrics
 
         sector_performance = {}
 
         for sector, tickers in SECTOR_MAPPING.items():
-            sector_returns = []
-            for ticker in tickers:
-                if ticker in self.stock_data:
-                    returns = self.stock_data[ticker]['prices']['Returns'].dropna()
-                    sector_returns.append(returns)
+            sector_df = self._window(self.panel.field_frame('Returns', tickers), start, end)
         
-            if sector_returns:                          # equal weighted sector returns
-                sector_df = pd.DataFrame({f"{sector}_{i}": ret for i, ret in enumerate(sector_returns)})
-                avg_returns = sector_df.mean(axis=1)
+            if len(sector_df.columns):                  # equal weighted sector returns
+                avg_returns = sector_df.mean(axis=1).dropna()
 
                 sector_performance[sector] = {
                     'annual_return': avg_returns.mean() * 252,
@@ -114,9 +113,173 @@ class FinancialDataProcessor:           # process and analyze financial data
 
         return risk_metrics
     
+    @property
+    def panel(self) -> PricePanel:          # aligned view of the whole universe, built on first use
+        if self._panel is None:
+            self._panel = PricePanel.from_stock_data(self.stock_data)
+        return self._panel
+
+    def _aligned_field(self, field: str) -> pd.DataFrame:         # dates x tickers frame of one price field
+        return self.panel.field_frame(field)
+
+    @property
+    def range_index(self) -> RangeStatsIndex:      # prefix-sum / sparse-table window statistics over the panel
+        if self._range_index is None:
+            self._range_index = RangeStatsIndex.from_panel(self.panel)
+        return self._range_index
+
+    def _window(self, frame: pd.DataFrame, start=None, end=None) -> pd.DataFrame:     # rows of a panel frame between two dates, inclusive
+        if start is None and end is None:
+            return frame
+        i, j = self.range_index.locate(start, end)
+        return frame.iloc[i:j]
+
+    def calculate_risk_table(self, tickers: List[str] = None, start=None, end=None) -> pd.DataFrame:     # window statistics plus VaR/CVaR, one row per ticker
+
+        stats = self.range_stats(tickers, start, end, high_low=True)
+        returns = self._window(self.panel.field_frame('Returns', list(stats.index)), start, end).to_numpy(dtype='float64')
+        if not len(returns):
+            returns = np.full((1, len(stats)), np.nan)
+        with warnings.catch_warnings():                 # tickers with no returns in the window just get NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for level in [95, 99]:
+                var = np.nanpercentile(returns, 100 - level, axis=0)
+                stats[f'var_{level}'] = var
+                stats[f'cvar_{level}'] = np.nanmean(np.where(returns <= var, returns, np.nan), axis=0)
+            stats['max_daily_loss'] = np.nanmin(returns, axis=0)
+            stats['max_daily_gain'] = np.nanmax(returns, axis=0)
+        return stats
+
+    def range_stats(self, tickers: List[str] = None, start=None, end=None, last_rows: int = None,
+                    high_low: bool = False) -> pd.DataFrame:       # return/volatility/high/low for any date window
+        return self.range_index.stats(tickers, start, end, last_rows, high_low)
+
+    def build_ticker_stats(self) -> pd.DataFrame:       # per-ticker summary statistics, computed once per data set
+
+        if self._ticker_stats is not None:
+            return self._ticker_stats
+
+        full = self.range_stats()
+        stats = pd.DataFrame(index=full.index)
+        stats['sector'] = [self.stock_data[t].get('sector') or self._sector_for(t) for t in full.index]
+        stats['annual_return'] = full['annual_return']
+        stats['annual_volatility'] = full['annual_volatility']
+        stats['sharpe_ratio'] = stats['annual_return'] / stats['annual_volatility']
+        stats['total_return'] = full['total_return']
+        stats['avg_volume'] = self._aligned_field('Volume').mean()
+
+        for label, window in PERIOD_RETURN_WINDOWS.items():        # same bars as prices.tail(window + 1)
+            stats[f'return_{label}'] = self.range_stats(last_rows=window + 1)['total_return']
+
+        for period in ANALYSIS_PERIODS:
+            windowed = full if period >= 999 else self.range_stats(last_rows=period)
+            stats[f'annual_return_{period}d'] = windowed['annual_return']
+            stats[f'annual_volatility_{period}d'] = windowed['annual_volatility']
+            stats[f'sharpe_ratio_{period}d'] = windowed['sharpe_ratio']
+
+        self._ticker_stats = stats
+        return stats
+
+    def fit_factor_model(self, k: int = 5, window: int = FACTOR_WINDOW) -> FactorModel:     # PCA factor model over the trailing window, cached per (k, window)
+
+        key = (k, window)
+        if key not in self._factor_models:
+            returns = self.panel.field_frame('Returns').dropna(how='all').tail(window)
+            self._factor_models[key] = FactorModel(returns, k=k)
+        return self._factor_models[key]
+
+    def roll_factor_models(self, previous: 'FinancialDataProcessor'):      # warm-start from the last snapshot's fitted models
+
+        returns = self.panel.field_frame('Returns').dropna(how='all')
+        for (k, window), model in previous._factor_models.items():
+            window_returns = returns.tail(window)
+            if list(window_returns.dropna(axis=1, how='all').columns) != model.tickers:
+                continue                    # universe changed, fit_factor_model() starts from scratch
+            self._factor_models[(k, window)] = model.roll(window_returns, len(window_returns))
+
+    def factor_portfolio_risk(self, tickers: List[str], weights: List[float] = None, k: int = 5) -> Dict:    # O(n * k) risk split for a portfolio
+
+        if weights is None:
+            weights = [1/len(tickers)] * len(tickers)
+        weights = pd.Series(weights, index=tickers, dtype='float64')
+
+        model = self.fit_factor_model(k)
+        variance = model.portfolio_variance(weights)
+        return {
+            'annual_volatility': np.sqrt(variance['total'] * 252),
+            'systematic_share': variance['systematic'] / variance['total'] if variance['total'] else np.nan,
+            'risk_contributions': model.risk_contributions(weights).reindex(tickers),
+            'explained_variance': model.explained_variance_ratio.sum()
+        }
+
+    @staticmethod
+    def _sector_for(ticker: str) -> str:
+        for sector, tickers in SECTOR_MAPPING.items():
+            if ticker in tickers:
+                return sector
+        return 'Other'
+
+    @property
+    def data_version(self) -> str:
+        if self._data_version is None:
+            self._data_version = compute_data_version(self.stock_data)
+        return self._data_version
+
+    def fit_garch_models(self, model: str = 'garch', tickers: List[str] = None,
+                         max_workers: int = None, use_cache: bool = True) -> pd.DataFrame:     # fit GARCH(1,1)/GJR-GARCH for the universe in a process pool
+
+        wanted = [t for t in (tickers or self.stock_data) if t in self.stock_data]
+        if not use_cache:
+            return self._fit_garch(wanted, model, max_workers)
+
+        filepath = os.path.join(self.processed_data_path, 'garch', f"{model}_{self.data_version}.csv")
+        if model not in self._garch_params:           # (params, tickers attempted); the file covers the whole universe
+            if os.path.exists(filepath):
+                self._garch_params[model] = (pd.read_csv(filepath, index_col='ticker'), set(self.stock_data))
+            else:
+                self._garch_params[model] = (_empty_garch_params(), set())
+        params, attempted = self._garch_params[model]
+
+        missing = [t for t in wanted if t not in attempted]
+        if missing:                                   # fit only tickers not seen before and merge them in
+            fitted = self._fit_garch(missing, model, max_workers)
+            if len(fitted):
+                params = pd.concat([params, fitted]) if len(params) else fitted
+            attempted = attempted | set(missing)
+            self._garch_params[model] = (params, attempted)
+            if len(attempted) == len(self.stock_data):
+                ensure_dir(os.path.dirname(filepath))
+                tmp = f"{filepath}.{os.getpid()}.{uuid.uuid4().hex}.tmp"       # unique per writer, threads included
+                params.to_csv(tmp)
+                os.replace(tmp, filepath)
+        return params.loc[[t for t in wanted if t in params.index]]
+
+    def _fit_garch(self, tickers: List[str], model: str, max_workers: int = None) -> pd.DataFrame:
+        jobs = [(ticker, self.stock_data[ticker]['prices']['Returns'].dropna().to_numpy(), model) for ticker in tickers]
+
+        if max_workers == 1 or len(jobs) < 2:
+            results = [_fit_garch_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_fit_garch_job, jobs, chunksize=max(1, len(jobs) // 32)))
+
+        rows = [r for r in results if r is not None]
+        return pd.DataFrame(rows).set_index('ticker') if rows else _empty_garch_params()
+
+    def garch_volatility(self, ticker: str, model: str = 'garch', horizon: int = 0) -> Tuple[pd.Series, np.ndarray]:   # conditional daily vol (%) and forecasts
+
+        params = self.fit_garch_models(model)
+        if ticker not in params.index:
+            return pd.Series(dtype=float), np.array([])
+        returns = self.stock_data[ticker]['prices']['Returns'].dropna()
+        row = params.loc[ticker]
+        sigma2 = garch_variance(row, returns.to_numpy(), model)
+        forecast = garch_forecast(row, horizon, model) if horizon else np.array([])
+        return pd.Series(np.sqrt(sigma2), index=returns.index), np.sqrt(forecast)
+
     def save_processed_data(self, data: Dict, filename: str):       # save processed data to a file
 
-        filepath = os.path.join(self.processed_data_path, filename)
+        filepath = os.path.join(ensure_dir(self.processed_data_path), filename)
 
         if isinstance(data, pd.DataFrame):
             data.to_csv(filepath)
@@ -127,9 +290,120 @@ class FinancialDataProcessor:           # process and analyze financial data
         
         print(f"Processed data saved to {filepath}")
 
-    
 
-# 
+def _garch_recursions(theta: np.ndarray, resid: np.ndarray, model: str, backcast: float,
+                      gradient: bool = False):     # sigma^2 path and d(sigma^2)/d(theta), all as linear filters
+
+    from scipy.signal import lfilter
+
+    beta = theta[-1]
+    e2 = resid ** 2
+    regressors = [np.ones_like(resid), e2]                          # omega, alpha
+    if model == 'gjr':
+        regressors.append(e2 * (resid < 0))                         # gamma (leverage term)
+    lagged = np.column_stack(regressors)[:-1]                       # sigma^2_t depends on information at t-1
+
+    drive = lagged @ theta[:-1]
+    sigma2 = np.empty_like(resid)
+    sigma2[0] = backcast
+    sigma2[1:] = lfilter([1.0], [1.0, -beta], drive, zi=[beta * backcast])[0]
+
+    if not gradient:
+        return sigma2, None
+
+    # d sigma^2_t = x_{t-1} + beta * d sigma^2_{t-1}, with x = (1, e^2, [e^2 * I], sigma^2) and a fixed backcast
+    inputs = np.column_stack([lagged, sigma2[:-1]])
+    grads = np.zeros((len(resid), len(theta)))
+    grads[1:] = lfilter([1.0], [1.0, -beta], inputs, axis=0)
+    return sigma2, grads
+
+
+def _garch_nll(theta: np.ndarray, resid: np.ndarray, model: str, backcast: float):     # Gaussian negative log-likelihood and its analytic gradient
+
+    sigma2, grads = _garch_recursions(theta, resid, model, backcast, gradient=True)
+    sigma2 = np.maximum(sigma2, 1e-12)
+    e2 = resid ** 2
+    nll = 0.5 * np.sum(np.log(2 * np.pi) + np.log(sigma2) + e2 / sigma2)
+    grad = 0.5 * ((sigma2 - e2) / sigma2 ** 2) @ grads
+    return nll, grad
+
+
+def fit_garch(returns: np.ndarray, model: str = 'garch') -> Dict:     # maximum likelihood GARCH(1,1) / GJR-GARCH(1,1,1)
+
+    from scipy.optimize import minimize
+
+    r = np.asarray(returns, dtype=float) * GARCH_SCALE
+    r = r[np.isfinite(r)]
+    mu = r.mean()
+    resid = r - mu
+    var = resid.var()
+    backcast = var
+
+    if model == 'gjr':
+        start = np.array([var * 0.05, 0.03, 0.05, 0.90])
+        persistence = np.array([0.0, 1.0, 0.5, 1.0])            # alpha + gamma/2 + beta
+    else:
+        start = np.array([var * 0.05, 0.05, 0.90])
+        persistence = np.array([0.0, 1.0, 1.0])
+    bounds = [(1e-8 * var, 10 * var)] + [(0.0, 1.0)] * (len(start) - 1)
+    stationarity = {'type': 'ineq', 'fun': lambda t: 0.9999 - persistence @ t, 'jac': lambda t: -persistence}
+
+    result = minimize(_garch_nll, start, args=(resid, model, backcast), jac=True, method='SLSQP',
+                      bounds=bounds, constraints=[stationarity], options={'maxiter': 200})
+    theta = result.x
+    sigma2, _ = _garch_recursions(theta, resid, model, backcast)
+
+    fitted = dict(zip(GARCH_MODELS[model], theta))
+    fitted.update({
+        'model': model,
+        'mu': mu,
+        'backcast': backcast,
+        'persistence': float(persistence @ theta),
+        'loglik': -float(result.fun),
+        'converged': bool(result.success),
+        'nobs': len(resid),
+        'last_resid': resid[-1],
+        'last_sigma2': sigma2[-1]
+    })
+    return fitted
+
+
+def _empty_garch_params() -> pd.DataFrame:
+    return pd.DataFrame(index=pd.Index([], name='ticker'))
+
+
+def _fit_garch_job(job: Tuple[str, np.ndarray, str]) -> Dict:      # process-pool entry point
+
+    ticker, returns, model = job
+    if len(returns) < 50:
+        return None
+    try:
+        fitted = fit_garch(returns, model)
+    except Exception as e:
+        print(f"GARCH fit failed for {ticker}: {e}")
+        return None
+    fitted['ticker'] = ticker
+    return fitted
+
+
+def garch_variance(params, returns: np.ndarray, model: str = 'garch') -> np.ndarray:    # conditional variance path (percent^2) for fitted params
+
+    theta = np.array([params[name] for name in GARCH_MODELS[model]], dtype=float)
+    resid = np.asarray(returns, dtype=float) * GARCH_SCALE - params['mu']
+    sigma2, _ = _garch_recursions(theta, resid, model, params['backcast'])
+    return sigma2
+
 
+def garch_forecast(params, horizon: int, model: str = 'garch') -> np.ndarray:     # h-step-ahead variance forecasts from the last observation
 
+    theta = dict((name, params[name]) for name in GARCH_MODELS[model])
+    shock = params['last_resid'] ** 2
+    one_step = theta['omega'] + theta['alpha'] * shock + theta['beta'] * params['last_sigma2']
+    if model == 'gjr':
+        one_step += theta['gamma'] * shock * (params['last_resid'] < 0)
 
+    forecasts = np.empty(horizon)
+    forecasts[0] = one_step
+    for h in range(1, horizon):
+        forecasts[h] = theta['omega'] + params['persistence'] * forecasts[h - 1]
+    return forecasts
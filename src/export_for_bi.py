@@ -1,18 +1,205 @@
 import pandas as pd
-import numpy as np
-import sys
 import os
+import json
+import argparse
+from urllib.parse import quote
 
-# Add project root to Python path to allow imports from src
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, project_root)
+from .data_collection import FinancialDataCollector
+from .data_processing import FinancialDataProcessor
+from .bi_warehouse import BIWarehouse
+from .resampling import ResamplingEngine, FREQUENCY_NAMES
+from .config import SECTOR_MAPPING, PROCESSED_DATA_DIR
 
-from src.data_collection import FinancialDataCollector
-from src.data_processing import FinancialDataProcessor
-from src.config import SECTOR_MAPPING
+MASTER_COLUMNS = [
+    'Date', 'Year', 'Month', 'Quarter', 'Ticker', 'Company_Name', 'Sector', 'Industry',
+    'Market_Cap_Billions', 'Open', 'High', 'Low', 'Close', 'Volume', 'Daily_Return_Pct',
+    'MA_20', 'MA_50', 'RSI'
+]
 
-def export_data_for_bi():
-    """Export all necessary data for BI tools."""
+
+def _sector_for(ticker):
+    for sect, tickers in SECTOR_MAPPING.items():
+        if ticker in tickers:
+            return sect
+    return 'Other'
+
+
+def build_company_dimension(stock_data):
+    """Small per-ticker dimension table joined onto the daily fact rows."""
+    return pd.DataFrame({
+        'Ticker': list(stock_data.keys()),
+        'Company_Name': [data['info'].get('longName', ticker) for ticker, data in stock_data.items()],
+        'Sector': [_sector_for(ticker) for ticker in stock_data],
+        'Industry': [data['info'].get('industry', 'Unknown') for data in stock_data.values()],
+        'Market_Cap_Billions': [(data['info'].get('marketCap') or 0) / 1e9 for data in stock_data.values()]
+    })
+
+
+def _master_rows(ticker, prices, typed_dates=False):
+    """Daily fact rows for one ticker, built column-wise."""
+    dates = pd.DatetimeIndex(prices.index)
+    years = dates.year.astype(str)
+    if typed_dates:                                 # calendar dates for Parquet, strings for CSV
+        date_column = (dates.tz_localize(None) if dates.tz is not None else dates).normalize()
+    else:
+        date_column = dates.strftime('%Y-%m-%d')
+
+    def column(name, decimals, scale=1):
+        if name not in prices:
+            return 0
+        return (prices[name] * scale).round(decimals).to_numpy()
+
+    return pd.DataFrame({
+        'Date': date_column,
+        'Year': dates.year,
+        'Month': dates.month,
+        'Quarter': 'Q' + dates.quarter.astype(str) + ' ' + years,
+        'Ticker': ticker,
+        'Open': column('Open', 2),
+        'High': column('High', 2),
+        'Low': column('Low', 2),
+        'Close': column('Close', 2),
+        'Volume': prices['Volume'].to_numpy(dtype='int64'),
+        'Daily_Return_Pct': column('Returns', 4, scale=100),
+        'MA_20': column('MA_20', 2),
+        'MA_50': column('MA_50', 2),
+        'RSI': column('RSI', 2)
+    })
+
+
+def iter_master_chunks(stock_data, chunk_rows=250_000, since=None, typed_dates=False):
+    """Yield master-table chunks of roughly chunk_rows rows so memory stays bounded.
+
+    since maps ticker -> last exported date; only bars after it are emitted.
+    """
+    dimension = build_company_dimension(stock_data)
+    pending, pending_rows = [], 0
+
+    for ticker, data in stock_data.items():
+        prices = data['prices']
+        if since and ticker in since:
+            prices = prices[_naive_dates(prices.index) > pd.Timestamp(since[ticker])]
+            if prices.empty:
+                continue
+        frame = _master_rows(ticker, prices, typed_dates)
+        pending.append(frame)
+        pending_rows += len(frame)
+        if pending_rows >= chunk_rows:
+            yield pd.concat(pending, ignore_index=True).merge(dimension, on='Ticker', how='left')[MASTER_COLUMNS]
+            pending, pending_rows = [], 0
+
+    if pending:
+        yield pd.concat(pending, ignore_index=True).merge(dimension, on='Ticker', how='left')[MASTER_COLUMNS]
+
+
+def write_master_table(stock_data, filepath, chunk_rows=250_000):
+    """Stream the master table to CSV chunk by chunk; returns the number of rows written."""
+    rows = 0
+    for i, chunk in enumerate(iter_master_chunks(stock_data, chunk_rows)):
+        chunk.to_csv(filepath, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows += len(chunk)
+    return rows
+
+
+def _naive_dates(index):
+    index = pd.DatetimeIndex(index)
+    return (index.tz_localize(None) if index.tz is not None else index).normalize()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+DICTIONARY_COLUMNS = ['Ticker', 'Sector', 'Company_Name', 'Industry', 'Quarter']
+
+
+def _to_arrow(df):
+    """Arrow table with dictionary-encoded categorical columns and date32 dates."""
+    pa, _ = _require_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if field.name in DICTIONARY_COLUMNS and not pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+        elif field.name == 'Date' and pa.types.is_timestamp(field.type):
+            table = table.set_column(i, 'Date', table.column(i).cast(pa.date32()))
+    return table
+
+
+def _write_parquet(df, filepath):
+    _, pq = _require_pyarrow()
+    tmp = filepath + '.tmp'
+    pq.write_table(_to_arrow(df), tmp, compression='zstd')
+    os.replace(tmp, filepath)                       # readers never see a half-written file
+
+
+def write_master_parquet(stock_data, dataset_dir, chunk_rows=250_000):
+    """Append new bars to a Year/Sector-partitioned Parquet dataset; returns rows appended.
+
+    A manifest keeps the last exported date per ticker, so later runs only read and
+    rewrite the partitions that actually receive new dates.
+    """
+    _, pq = _require_pyarrow()
+    os.makedirs(dataset_dir, exist_ok=True)
+    manifest_path = os.path.join(dataset_dir, '_manifest.json')
+    manifest = {'last_date': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    appended = 0
+    for chunk in iter_master_chunks(stock_data, chunk_rows, since=manifest['last_date'], typed_dates=True):
+        for (year, sector), rows in chunk.groupby(['Year', 'Sector'], sort=False):
+            partition = os.path.join(dataset_dir, f"Year={year}", f"Sector={quote(sector, safe='')}")
+            filepath = os.path.join(partition, 'part-0.parquet')
+            os.makedirs(partition, exist_ok=True)
+
+            rows = rows.drop(columns=['Year', 'Sector'])          # encoded in the partition path
+            if os.path.exists(filepath):
+                existing = pq.read_table(filepath).to_pandas()
+                existing['Date'] = pd.to_datetime(existing['Date'])
+                rows = pd.concat([existing.astype({c: object for c in DICTIONARY_COLUMNS if c in existing}), rows],
+                                 ignore_index=True)
+                rows = rows.drop_duplicates(subset=['Ticker', 'Date'], keep='last')
+            _write_parquet(rows.sort_values(['Ticker', 'Date']), filepath)
+
+        for ticker, last in chunk.groupby('Ticker')['Date'].max().items():
+            manifest['last_date'][ticker] = last.strftime('%Y-%m-%d')
+        appended += len(chunk)
+
+        with open(manifest_path + '.tmp', 'w') as f:      # checkpoint after every chunk so a crash resumes cleanly
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    return appended
+
+
+def _write_table(df, output_dir, name, output_format):
+    """Write one of the small summary tables as CSV or a single Parquet file."""
+    if output_format == 'parquet':
+        filepath = os.path.join(output_dir, f"{name}.parquet")
+        _write_parquet(df, filepath)
+    else:
+        filepath = os.path.join(output_dir, f"{name}.csv")
+        df.to_csv(filepath, index=False)
+    return filepath
+
+
+def export_data_for_bi(output_format='csv', output_dir=None, database_engine=None, database_path=None,
+                       frequencies=None):
+    """Export all necessary data for BI tools.
+
+    output_format is 'csv' (full rewrite) or 'parquet' (partitioned master dataset with
+    incremental append); files go to output_dir, PROCESSED_DATA_DIR by default.
+    database_engine ('sqlite' or 'duckdb') additionally loads the star-schema warehouse, and
+    frequencies (e.g. ['W', 'Q']) adds resampled OHLCV tables for the whole universe.
+    """
+    output_dir = output_dir or PROCESSED_DATA_DIR
+    os.makedirs(output_dir, exist_ok=True)
     
     # Load data
     collector = FinancialDataCollector()
@@ -21,48 +208,17 @@ def export_data_for_bi():
     
     # 1. Master dataset for time series analysis
     print("Creating master dataset...")
-    master_data = []
-    
-    for ticker, data in stock_data.items():
-        prices = data['prices']
-        info = data['info']
-        
-        # Get sector
-        sector = 'Other'
-        for sect, tickers in SECTOR_MAPPING.items():
-            if ticker in tickers:
-                sector = sect
-                break
-        
-        for date, row in prices.iterrows():
-            master_data.append({
-                'Date': date.strftime('%Y-%m-%d'),
-                'Year': date.year,
-                'Month': date.month,
-                'Quarter': f"Q{((date.month-1)//3)+1} {date.year}",
-                'Ticker': ticker,
-                'Company_Name': info.get('longName', ticker),
-                'Sector': sector,
-                'Industry': info.get('industry', 'Unknown'),
-                'Market_Cap_Billions': info.get('marketCap', 0) / 1e9,
-                'Open': round(row['Open'], 2),
-                'High': round(row['High'], 2),
-                'Low': round(row['Low'], 2),
-                'Close': round(row['Close'], 2),
-                'Volume': int(row['Volume']),
-                'Daily_Return_Pct': round(row.get('Returns', 0) * 100, 4),
-                'MA_20': round(row.get('MA_20', 0), 2),
-                'MA_50': round(row.get('MA_50', 0), 2),
-                'RSI': round(row.get('RSI', 0), 2)
-            })
-    
-    master_df = pd.DataFrame(master_data)
-    master_df.to_csv('..notebooks/data/processed/bi_master_data.csv', index=False)
-    print(f"Master dataset created: {len(master_df)} rows")
+    if output_format == 'parquet':
+        rows = write_master_parquet(stock_data, os.path.join(output_dir, 'bi_master_data'))
+        print(f"Master dataset updated: {rows} new rows")
+    else:
+        rows = write_master_table(stock_data, os.path.join(output_dir, 'bi_master_data.csv'))
+        print(f"Master dataset created: {rows} rows")
     
     # 2. Company information table
     print("Creating company info table...")
     company_info = []
+    index = processor.range_index
     for ticker, data in stock_data.items():
         info = data['info']
         
@@ -73,9 +229,13 @@ def export_data_for_bi():
                 sector = sect
                 break
         
-        # Calculate key metrics
-        prices = data['prices']['Close']
-        returns = data['prices']['Returns'].dropna()
+        # Key metrics from the range index: trailing 52 weeks, year to date and full history
+        last_date = data['prices'].index[-1]
+        high_52w, low_52w = index.high_low(ticker, *index.locate(last_date - pd.DateOffset(weeks=52), last_date))
+        year_start, end = index.locate(last_date.replace(month=1, day=1), last_date)
+        base = index.prior_close_row(ticker, year_start)          # YTD is measured from the prior year's last close
+        ytd = index.window_stats(ticker, base if base >= 0 else year_start, end)
+        full = index.window_stats(ticker, *index.locate())
         
         company_info.append({
             'Ticker': ticker,
@@ -83,11 +243,11 @@ def export_data_for_bi():
             'Sector': sector,
             'Industry': info.get('industry', 'Unknown'),
             'Market_Cap_Billions': round(info.get('marketCap', 0) / 1e9, 2),
-            'Current_Price': round(prices.iloc[-1], 2),
-            'Price_52W_High': round(prices.max(), 2),
-            'Price_52W_Low': round(prices.min(), 2),
-            'YTD_Return_Pct': round(((prices.iloc[-1] - prices.iloc[0]) / prices.iloc[0]) * 100, 2),
-            'Annual_Volatility_Pct': round(returns.std() * np.sqrt(252) * 100, 2),
+            'Current_Price': round(full['last_close'], 2),
+            'Price_52W_High': round(high_52w, 2),
+            'Price_52W_Low': round(low_52w, 2),
+            'YTD_Return_Pct': round(ytd['total_return'] * 100, 2),
+            'Annual_Volatility_Pct': round(full['annual_volatility'] * 100, 2),
             'Average_Volume': int(data['prices']['Volume'].mean()),
             'Employee_Count': info.get('fullTimeEmployees', 0),
             'Country': info.get('country', 'Unknown'),
@@ -96,77 +256,80 @@ def export_data_for_bi():
         })
     
     company_df = pd.DataFrame(company_info)
-    company_df.to_csv('../data/processed/bi_company_info.csv', index=False)
+    _write_table(company_df, output_dir, 'bi_company_info', output_format)
     print(f"Company info created: {len(company_df)} companies")
     
     # 3. Sector performance summary
     print("Creating sector performance table...")
-    sector_performance = []
+    ticker_stats = processor.build_ticker_stats()
+    ticker_stats = ticker_stats[ticker_stats['sector'].isin(list(SECTOR_MAPPING.keys()))].assign(
+        annual_return_pct=lambda df: df['annual_return'] * 100,
+        market_cap_billions=lambda df: [stock_data[t]['info'].get('marketCap', 0) / 1e9 for t in df.index]
+    )
+    grouped = ticker_stats.groupby('sector', sort=False)
     
-    for sector, tickers in SECTOR_MAPPING.items():
-        sector_stocks = [t for t in tickers if t in stock_data]
-        if not sector_stocks:
-            continue
-            
-        sector_returns = []
-        sector_market_cap = 0
-        sector_volume = 0
-        
-        for ticker in sector_stocks:
-            returns = stock_data[ticker]['prices']['Returns'].dropna()
-            annual_return = returns.mean() * 252 * 100
-            market_cap = stock_data[ticker]['info'].get('marketCap', 0) / 1e9
-            avg_volume = stock_data[ticker]['prices']['Volume'].mean()
-            
-            sector_returns.append(annual_return)
-            sector_market_cap += market_cap
-            sector_volume += avg_volume
-        
-        sector_performance.append({
-            'Sector': sector,
-            'Stock_Count': len(sector_stocks),
-            'Total_Market_Cap_Billions': round(sector_market_cap, 2),
-            'Avg_Annual_Return_Pct': round(np.mean(sector_returns), 2),
-            'Return_Volatility_Pct': round(np.std(sector_returns), 2),
-            'Total_Avg_Volume': int(sector_volume),
-            'Best_Performer': max(sector_stocks, key=lambda x: ((stock_data[x]['prices']['Close'].iloc[-1] - stock_data[x]['prices']['Close'].iloc[0]) / stock_data[x]['prices']['Close'].iloc[0]) * 100),
-            'Worst_Performer': min(sector_stocks, key=lambda x: ((stock_data[x]['prices']['Close'].iloc[-1] - stock_data[x]['prices']['Close'].iloc[0]) / stock_data[x]['prices']['Close'].iloc[0]) * 100)
-        })
-    
-    sector_df = pd.DataFrame(sector_performance)
-    sector_df.to_csv('../data/processed/bi_sector_performance.csv', index=False)
+    sector_df = pd.DataFrame({
+        'Stock_Count': grouped.size(),
+        'Total_Market_Cap_Billions': grouped['market_cap_billions'].sum().round(2),
+        'Avg_Annual_Return_Pct': grouped['annual_return_pct'].mean().round(2),
+        'Return_Volatility_Pct': grouped['annual_return_pct'].std(ddof=0).round(2),
+        'Total_Avg_Volume': grouped['avg_volume'].sum().astype(int),
+        'Best_Performer': grouped['total_return'].idxmax(),
+        'Worst_Performer': grouped['total_return'].idxmin()
+    })
+    sector_df = sector_df.reindex([s for s in SECTOR_MAPPING if s in sector_df.index]).rename_axis('Sector').reset_index()
+    _write_table(sector_df, output_dir, 'bi_sector_performance', output_format)
     print(f"Sector performance created: {len(sector_df)} sectors")
     
-    # 4. Monthly performance summary
+    # 4. Monthly performance summary (whole universe, one batched resample)
     print("Creating monthly performance table...")
-    monthly_data = []
-    
-    for ticker in list(stock_data.keys())[:20]:  # Top 20 stocks for performance
-        prices = stock_data[ticker]['prices']
-        monthly_prices = prices['Close'].resample('M').last()
-        monthly_returns = monthly_prices.pct_change().dropna() * 100
-        
-        for date, return_pct in monthly_returns.items():
-            monthly_data.append({
-                'Year_Month': date.strftime('%Y-%m'),
-                'Year': date.year,
-                'Month': date.month,
-                'Month_Name': date.strftime('%B'),
-                'Ticker': ticker,
-                'Monthly_Return_Pct': round(return_pct, 2),
-                'Month_End_Price': round(monthly_prices[date], 2)
-            })
+    resampler = ResamplingEngine.from_stock_data(stock_data)
+    monthly = resampler.long_table('M').dropna(subset=['Returns'])
+    order = {ticker: i for i, ticker in enumerate(stock_data)}
+    monthly = monthly.sort_values('Ticker', kind='stable', key=lambda t: t.map(order))
+    dates = pd.DatetimeIndex(monthly['Date'])
     
-    monthly_df = pd.DataFrame(monthly_data)
-    monthly_df.to_csv('../data/processed/bi_monthly_performance.csv', index=False)
+    monthly_df = pd.DataFrame({
+        'Year_Month': dates.strftime('%Y-%m'),
+        'Year': dates.year,
+        'Month': dates.month,
+        'Month_Name': dates.strftime('%B'),
+        'Ticker': monthly['Ticker'].to_numpy(),
+        'Monthly_Return_Pct': (monthly['Returns'] * 100).round(2).to_numpy(),
+        'Month_End_Price': monthly['Close'].round(2).to_numpy()
+    })
+    _write_table(monthly_df, output_dir, 'bi_monthly_performance', output_format)
     print(f"Monthly performance created: {len(monthly_df)} records")
     
+    # Coarser OHLCV bars for BI tools that don't need daily granularity
+    for freq in frequencies or []:
+        bars = resampler.long_table(freq)
+        bar_dates = pd.DatetimeIndex(bars['Date'])
+        bars['Date'] = bar_dates.tz_localize(None) if bar_dates.tz is not None else bar_dates
+        name = f"bi_ohlcv_{FREQUENCY_NAMES[freq].lower()}"
+        _write_table(bars, output_dir, name, output_format)
+        print(f"{FREQUENCY_NAMES[freq]} OHLCV bars created: {len(bars)} records")
+    
+    # 5. Embedded analytical database
+    if database_engine:
+        print("Loading BI warehouse...")
+        warehouse = BIWarehouse(database_path or os.path.join(output_dir, f"bi_warehouse.{'duckdb' if database_engine == 'duckdb' else 'db'}"),
+                                database_engine)
+        warehouse.load(stock_data)
+        warehouse.close()
+    
+    extension = 'parquet' if output_format == 'parquet' else 'csv'
     print("\n✅ All BI data exports completed!")
-    print("Files created:")
-    print("- bi_master_data.csv (main dataset)")
-    print("- bi_company_info.csv (company details)")
-    print("- bi_sector_performance.csv (sector summaries)")
-    print("- bi_monthly_performance.csv (monthly returns)")
+    print(f"Files created in {output_dir}:")
+    print("- bi_master_data" + ("/ (partitioned by Year/Sector)" if output_format == 'parquet' else ".csv") + " (main dataset)")
+    print(f"- bi_company_info.{extension} (company details)")
+    print(f"- bi_sector_performance.{extension} (sector summaries)")
+    print(f"- bi_monthly_performance.{extension} (monthly returns)")
+    if database_engine:
+        print(f"- {warehouse.path} (star schema: fact_daily_bar, dim_company, dim_sector, dim_date)")
 
 if __name__ == "__main__":
-    export_data_for_bi()
\ No newline at end of file
+    from .cli import add_export_arguments
+
+    args = add_export_arguments(argparse.ArgumentParser(description="Export data for BI tools")).parse_args()
+    export_data_for_bi(args.format, args.output_dir, args.database, args.database_path, args.frequencies)
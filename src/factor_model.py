@@ -0,0 +1,130 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Statistical factor model: returns X (dates x tickers) are approximated by k factors,
+#     X ~= F B'  with covariance  Sigma ~= B Omega B' + diag(specific_var)
+# where B (tickers x k) are loadings, F (dates x k) factor returns and Omega = cov(F).
+# Factors come from a truncated SVD of the standardized returns, computed with a
+# randomized range finder, so nothing of size tickers x tickers is ever formed and
+# portfolio variance, risk contributions and Sigma @ v all cost O(n * k).
+
+TRADING_DAYS = 252
+
+
+def randomized_svd(matrix: np.ndarray, k: int, oversample: int = 10, n_iter: int = 4,
+                   init: np.ndarray = None, seed: int = 0):          # Halko et al. range finder with power iterations
+
+    n = matrix.shape[1]
+    width = min(k + oversample, min(matrix.shape))
+    if init is not None and init.shape[0] == n:                # warm start from a previous right subspace, topped up with random columns
+        extra = np.random.default_rng(seed).standard_normal((n, max(width - init.shape[1], 0)))
+        omega = np.hstack([init[:, :width], extra])
+    else:
+        omega = np.random.default_rng(seed).standard_normal((n, width))
+
+    q, _ = np.linalg.qr(matrix @ omega)
+    for _ in range(n_iter):             # re-orthonormalize each half step for numerical stability
+        z, _ = np.linalg.qr(matrix.T @ q)
+        q, _ = np.linalg.qr(matrix @ z)
+
+    u_small, s, vt = np.linalg.svd(q.T @ matrix, full_matrices=False)
+    return (q @ u_small)[:, :k], s[:k], vt[:k]
+
+
+def _standardize(returns: pd.DataFrame):            # demeaned, unit-variance returns with gaps set to zero
+    values = returns.to_numpy(dtype='float64')
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0, ddof=1)
+    std = np.where(std > 0, std, 1.0)
+    z = np.nan_to_num((values - mean) / std)
+    return z, mean, std
+
+
+class FactorModel:                  # top-k statistical factors over a window of aligned returns
+
+    def __init__(self, returns: pd.DataFrame, k: int = 5, n_iter: int = 4, init: np.ndarray = None, seed: int = 0):
+
+        returns = returns.dropna(axis=1, how='all').dropna(axis=0, how='all')
+        k = min(k, *returns.shape)
+        self.k = k
+        self.returns = returns                  # kept for roll()
+        self.tickers = list(returns.columns)
+
+        z, self.mean, self.std = _standardize(returns)
+        u, s, vt = randomized_svd(z, k, n_iter=n_iter, init=init, seed=seed)
+        self._components = vt.T                 # (n, k) orthonormal directions in standardized space
+
+        factors = [f'F{i + 1}' for i in range(k)]
+        factor_returns = z @ self._components   # = u * s
+        loadings = self.std[:, None] * self._components
+
+        x = np.nan_to_num(returns.to_numpy(dtype='float64') - self.mean)
+        residual = x - factor_returns @ loadings.T
+        observations = max(len(returns) - 1, 1)
+
+        self.loadings = pd.DataFrame(loadings, index=self.tickers, columns=factors)
+        self.factor_returns = pd.DataFrame(factor_returns, index=returns.index, columns=factors)
+        self.factor_cov = np.cov(factor_returns, rowvar=False, ddof=1).reshape(k, k)
+        self.specific_var = pd.Series((residual ** 2).sum(axis=0) / observations, index=self.tickers)
+        total = (z ** 2).sum()
+        self.explained_variance_ratio = pd.Series(s ** 2 / total if total else np.zeros(k), index=factors)
+
+    @property
+    def specific_risk(self) -> pd.Series:        # annualized idiosyncratic volatility per ticker
+        return np.sqrt(self.specific_var * TRADING_DAYS)
+
+    @property
+    def total_risk(self) -> pd.Series:           # annualized volatility per ticker, the diagonal of Sigma in O(n * k)
+        b = self.loadings.to_numpy()
+        variance = ((b @ self.factor_cov) * b).sum(axis=1) + self.specific_var.to_numpy()
+        return pd.Series(np.sqrt(variance * TRADING_DAYS), index=self.tickers)
+
+    def _weights(self, weights) -> np.ndarray:  # dict / Series / array over the model's tickers
+        if isinstance(weights, dict):
+            weights = pd.Series(weights, dtype='float64')
+        if isinstance(weights, pd.Series):
+            return weights.reindex(self.tickers).fillna(0.0).to_numpy(dtype='float64')
+        return np.asarray(weights, dtype='float64')
+
+    def cov_dot(self, vector) -> np.ndarray:        # Sigma @ v without forming Sigma: O(n * k)
+        v = self._weights(vector)
+        b = self.loadings.to_numpy()
+        return b @ (self.factor_cov @ (b.T @ v)) + self.specific_var.to_numpy() * v
+
+    def portfolio_variance(self, weights) -> Dict[str, float]:     # daily variance split into factor and specific parts
+        w = self._weights(weights)
+        exposure = self.loadings.to_numpy().T @ w
+        systematic = float(exposure @ self.factor_cov @ exposure)
+        specific = float((self.specific_var.to_numpy() * w * w).sum())
+        return {'systematic': systematic, 'specific': specific, 'total': systematic + specific}
+
+    def portfolio_volatility(self, weights) -> float:       # annualized
+        return float(np.sqrt(self.portfolio_variance(weights)['total'] * TRADING_DAYS))
+
+    def risk_contributions(self, weights) -> pd.Series:     # w_i (Sigma w)_i / sigma_p; sums to the portfolio volatility
+        w = self._weights(weights)
+        sigma_w = self.cov_dot(w)
+        daily_vol = np.sqrt(w @ sigma_w)
+        contributions = w * sigma_w / daily_vol if daily_vol else np.zeros_like(w)
+        return pd.Series(contributions * np.sqrt(TRADING_DAYS), index=self.tickers)
+
+    def covariance(self, tickers: List[str] = None) -> pd.DataFrame:      # dense block, only for a small subset
+        tickers = [t for t in (tickers or self.tickers) if t in self.loadings.index]
+        b = self.loadings.loc[tickers].to_numpy()
+        cov = b @ self.factor_cov @ b.T + np.diag(self.specific_var.loc[tickers].to_numpy())
+        return pd.DataFrame(cov, index=tickers, columns=tickers)
+
+    def correlation(self, tickers: List[str] = None) -> pd.DataFrame:
+        cov = self.covariance(tickers)
+        vol = np.sqrt(np.diag(cov.to_numpy()))
+        return cov / np.outer(vol, vol)
+
+    def roll(self, new_returns: pd.DataFrame, window: int = None, n_iter: int = 1) -> 'FactorModel':    # slide the window, warm-started
+
+        window = window or len(self.returns)
+        older = self.returns[self.returns.index < new_returns.index[0]]      # new_returns wins from its first date on (revisions)
+        combined = pd.concat([older, new_returns.reindex(columns=self.tickers)]).tail(window)
+        # the previous factor directions are already close, so one power iteration is usually enough
+        return FactorModel(combined, self.k, n_iter=n_iter, init=self._components)
@@ -0,0 +1,205 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+
+# Bucket upper bounds for the exported histograms (Prometheus style, +Inf is implicit)
+SECONDS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+BYTES_BUCKETS = [1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7]
+CARDINALITY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]
+
+DASH_UPDATE_PATH = '/_dash-update-component'
+
+
+class Histogram:                    # cumulative-bucket histogram with sum and count
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        total, out = 0, []
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+
+class StackSampler:                 # samples one thread's Python stack on a timer while a slow-request candidate runs
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='callback-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+class CallbackMetrics:              # per-callback latency, payload size and input cardinality for a Dash app
+
+    METRICS = {
+        'compute_seconds': SECONDS_BUCKETS,
+        'serialize_seconds': SECONDS_BUCKETS,
+        'total_seconds': SECONDS_BUCKETS,
+        'response_bytes': BYTES_BUCKETS,
+        'input_cardinality': CARDINALITY_BUCKETS
+    }
+
+    def __init__(self, log_path: str = None, profile_slow_ms: float = None, profile_dir: str = None):
+        self.log_path = log_path
+        self.profile_slow_ms = profile_slow_ms
+        self.profile_dir = profile_dir or 'profiles'
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def instrument(self, name: str) -> Callable:        # decorator applied underneath @app.callback
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                sampler = None
+                if self.profile_slow_ms is not None:
+                    sampler = StackSampler(threading.get_ident()).start()
+
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    compute = time.perf_counter() - started
+                    samples = sampler.stop() if sampler else None
+                    record = {'callback': name, 'compute_seconds': compute,
+                              'input_cardinality': self._cardinality(args)}
+                    if not self._defer_to_response(record):
+                        self.observe(record)        # called outside a Dash request: compute phase only
+                    if samples is not None and compute * 1000 >= self.profile_slow_ms:
+                        self._dump_profile(name, compute, samples)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _cardinality(args) -> int:          # e.g. number of selected tickers; scalar inputs count as one
+        sizes = [len(a) for a in args if isinstance(a, (list, tuple))]
+        return sum(sizes) if sizes else len([a for a in args if a is not None])
+
+    def _defer_to_response(self, record: Dict) -> bool:     # finish the record once Dash has serialized the response
+
+        try:
+            from flask import g, has_request_context
+        except ImportError:
+            return False
+        if not has_request_context():
+            return False
+        g.callback_metrics = record
+        return True
+
+    def attach(self, server, endpoint: str = '/metrics'):       # hook the Flask server and expose the metrics endpoint
+
+        from flask import Response, g, jsonify, request
+
+        @server.before_request
+        def _start_timer():
+            g.request_started = time.perf_counter()
+
+        @server.after_request
+        def _finish_record(response):
+            record = g.pop('callback_metrics', None)
+            if record is not None and request.path == DASH_UPDATE_PATH:
+                total = time.perf_counter() - g.get('request_started', time.perf_counter())
+                record['total_seconds'] = total
+                record['serialize_seconds'] = max(total - record['compute_seconds'], 0.0)
+                record['response_bytes'] = response.content_length or len(response.get_data())
+                record['status'] = response.status_code
+                self.observe(record)
+            return response
+
+        @server.route(endpoint)
+        def _metrics():
+            if request.args.get('format') == 'json':
+                return jsonify(self.as_dict())
+            return Response(self.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    def observe(self, record: Dict):
+
+        with self._lock:
+            histograms = self._histograms.setdefault(
+                record['callback'], {m: Histogram(b) for m, b in self.METRICS.items()})
+            for metric, histogram in histograms.items():
+                if metric in record:
+                    histogram.observe(record[metric])
+
+            if self.log_path:
+                record = dict(record, ts=time.time())
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+
+    def _dump_profile(self, name: str, elapsed: float, samples: Counter):     # folded stacks, ready for flamegraph.pl / speedscope
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        filepath = os.path.join(self.profile_dir, f"{name}-{int(time.time() * 1000)}-{elapsed * 1000:.0f}ms.folded")
+        with open(filepath, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Slow callback {name} ({elapsed * 1000:.0f} ms) profile saved to {filepath}")
+
+    def as_dict(self) -> Dict:
+
+        with self._lock:
+            return {
+                name: {
+                    metric: {'count': h.count, 'sum': h.sum,
+                             'buckets': dict(zip([str(b) for b in h.buckets] + ['+Inf'], h.cumulative()))}
+                    for metric, h in histograms.items()
+                }
+                for name, histograms in self._histograms.items()
+            }
+
+    def render_prometheus(self) -> str:         # text exposition format
+
+        lines = []
+        snapshot = self.as_dict()
+        for metric in self.METRICS:
+            family = f"dash_callback_{metric}"
+            lines.append(f"# TYPE {family} histogram")
+            for name, metrics in snapshot.items():
+                h = metrics[metric]
+                for bound, count in h['buckets'].items():
+                    lines.append(f'{family}_bucket{{callback="{name}",le="{bound}"}} {count}')
+                lines.append(f'{family}_sum{{callback="{name}"}} {h["sum"]}')
+                lines.append(f'{family}_count{{callback="{name}"}} {h["count"]}')
+        return '\n'.join(lines) + '\n'
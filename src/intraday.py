@@ -0,0 +1,202 @@
+import json
+import os
+import re
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .config import RAW_DATA_DIR, SP500_TOP_50, SECTOR_MAPPING, ensure_dir
+from .data_collection import add_technical_indicators
+
+# On-disk layout, one directory per bar interval:
+#   <root>/<interval>/meta.json                  exchange timezone used to split sessions
+#   <root>/<interval>/<ticker>/<yyyymmdd>.npy    one session of bars (BAR_DTYPE), memory-mapped on read
+#   <root>/<interval>/<ticker>/_daily.npy        one rolled-up OHLCV row per session (DAILY_DTYPE)
+# Only the sessions a reader asks for are ever opened, so history size does not bound memory.
+# Every file is written to a temporary name first and swapped in with os.replace.
+
+INTRADAY_DATA_DIR = os.path.join(RAW_DATA_DIR, 'intraday')
+INTRADAY_INTERVALS = {'1m': '7d', '5m': '60d'}          # interval -> longest period Yahoo serves for it
+INTRADAY_NAMES = {'1m': '1-Minute', '5m': '5-Minute'}
+EXCHANGE_TZ = 'America/New_York'
+
+BAR_DTYPE = np.dtype([('ts', '<u4'), ('open', '<f4'), ('high', '<f4'), ('low', '<f4'),
+                      ('close', '<f4'), ('volume', '<u4')])      # ts: seconds since epoch, UTC
+DAILY_DTYPE = np.dtype([('day', '<u4'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                        ('close', '<f8'), ('volume', '<u8'), ('bars', '<u4')])
+BAR_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+SESSION_FILE = re.compile(r'^(\d{8})\.npy$')
+
+
+def _save_atomic(filepath: str, array: np.ndarray):      # temp name never matches SESSION_FILE, even if left behind by a crash
+    tmp = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, filepath)
+
+
+def _to_records(bars: pd.DataFrame, tz: str) -> np.ndarray:         # yfinance-style OHLCV frame -> BAR_DTYPE rows
+    bars = bars.dropna(subset=['Close'])
+    index = bars.index if bars.index.tz is not None else bars.index.tz_localize(tz)     # naive times are exchange-local
+    index = index.tz_convert('UTC')
+    records = np.empty(len(bars), dtype=BAR_DTYPE)
+    records['ts'] = index.as_unit('s').asi8
+    for field, column in BAR_COLUMNS.items():
+        values = bars[column].to_numpy(dtype='float64')
+        if field == 'volume':
+            values = np.clip(np.nan_to_num(values), 0, np.iinfo(np.uint32).max)
+        records[field] = values
+    return records
+
+
+def _rollup(day: int, chunk: np.ndarray) -> tuple:          # one session of bars -> one daily OHLCV row
+    return (day, chunk['open'][0], chunk['high'].max(), chunk['low'].min(), chunk['close'][-1],
+            int(chunk['volume'].sum(dtype='uint64')), len(chunk))
+
+
+class IntradayStore:                # chunked per-ticker, per-session storage for minute bars
+
+    def __init__(self, root: str = None, interval: str = '1m', tz: str = EXCHANGE_TZ):
+        if interval not in INTRADAY_INTERVALS:
+            raise ValueError(f"Unsupported interval {interval}, expected one of {list(INTRADAY_INTERVALS)}")
+        self.interval = interval
+        self.path = os.path.join(root or INTRADAY_DATA_DIR, interval)
+        self.tz = tz
+        meta_path = os.path.join(self.path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.tz = json.load(f).get('tz', tz)
+
+    def tickers(self) -> List[str]:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(t for t in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, t)))
+
+    def days(self, ticker: str) -> List[int]:          # stored sessions as yyyymmdd integers, ascending
+        directory = os.path.join(self.path, ticker)
+        if not os.path.isdir(directory):
+            return []
+        matches = (SESSION_FILE.match(name) for name in os.listdir(directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def _chunk_path(self, ticker: str, day: int) -> str:
+        return os.path.join(self.path, ticker, f"{day}.npy")
+
+    def write(self, ticker: str, bars: pd.DataFrame) -> int:       # merge bars into their session chunks; returns sessions touched
+
+        records = _to_records(bars, self.tz)
+        if not len(records):
+            return 0
+        self._write_meta()
+        ensure_dir(os.path.join(self.path, ticker))
+
+        local = pd.to_datetime(records['ts'], unit='s', utc=True).tz_convert(self.tz)
+        day_keys = (local.year * 10000 + local.month * 100 + local.day).to_numpy(dtype='uint32')
+        rollups = {}
+        for day in np.unique(day_keys):
+            chunk = records[day_keys == day]
+            filepath = self._chunk_path(ticker, int(day))
+            if os.path.exists(filepath):                # re-ingesting a session: new bars win on equal timestamps
+                chunk = np.concatenate([np.load(filepath), chunk])
+                _, last = np.unique(chunk['ts'][::-1], return_index=True)
+                chunk = chunk[len(chunk) - 1 - last]
+            chunk = np.sort(chunk, order='ts')
+            _save_atomic(filepath, chunk)
+            rollups[int(day)] = _rollup(int(day), chunk)
+
+        self._update_daily(ticker, rollups)
+        return len(rollups)
+
+    def _write_meta(self):
+        meta_path = os.path.join(ensure_dir(self.path), 'meta.json')
+        if not os.path.exists(meta_path):
+            with open(meta_path, 'w') as f:
+                json.dump({'interval': self.interval, 'tz': self.tz}, f)
+
+    def _update_daily(self, ticker: str, rollups: Dict[int, tuple]):
+        filepath = os.path.join(self.path, ticker, '_daily.npy')
+        existing = np.load(filepath) if os.path.exists(filepath) else np.empty(0, dtype=DAILY_DTYPE)
+        kept = existing[~np.isin(existing['day'], list(rollups))]
+        daily = np.concatenate([kept, np.array(list(rollups.values()), dtype=DAILY_DTYPE)])
+        _save_atomic(filepath, np.sort(daily, order='day'))
+
+    def iter_chunks(self, ticker: str, days: List[int] = None) -> Iterator[np.ndarray]:    # memory-mapped session chunks
+        for day in (self.days(ticker) if days is None else days):
+            filepath = self._chunk_path(ticker, day)
+            if os.path.exists(filepath):
+                yield np.load(filepath, mmap_mode='r')
+
+    def read(self, ticker: str, start=None, end=None) -> pd.DataFrame:      # bars between two timestamps/dates, inclusive
+
+        days = self.days(ticker)
+        start, end = self._localize(start), self._localize(end)
+        if start is not None:
+            days = [d for d in days if d >= int(start.strftime('%Y%m%d'))]
+        if end is not None:
+            days = [d for d in days if d <= int(end.strftime('%Y%m%d'))]
+
+        frame = self._frame(list(self.iter_chunks(ticker, days)))
+        if start is not None and start != start.normalize():
+            frame = frame[frame.index >= start]
+        if end is not None and end != end.normalize():             # a bare date means the whole session
+            frame = frame[frame.index <= end]
+        return frame
+
+    def _localize(self, when):
+        if when is None:
+            return None
+        when = pd.Timestamp(when)
+        return when.tz_convert(self.tz) if when.tz is not None else when.tz_localize(self.tz)
+
+    def read_sessions(self, ticker: str, sessions: int = 5) -> pd.DataFrame:        # the most recent N sessions
+        return self._frame(list(self.iter_chunks(ticker, self.days(ticker)[-sessions:])))
+
+    def _frame(self, chunks: List[np.ndarray]) -> pd.DataFrame:
+        records = np.concatenate(chunks) if chunks else np.empty(0, dtype=BAR_DTYPE)
+        index = pd.DatetimeIndex(pd.to_datetime(records['ts'], unit='s', utc=True).tz_convert(self.tz), name='Datetime')
+        return pd.DataFrame({column: records[field] for field, column in BAR_COLUMNS.items()}, index=index)
+
+    def daily_bars(self, ticker: str) -> pd.DataFrame:      # daily OHLCV plus the usual indicator columns
+        filepath = os.path.join(self.path, ticker, '_daily.npy')
+        daily = np.load(filepath) if os.path.exists(filepath) else np.empty(0, dtype=DAILY_DTYPE)
+        index = pd.DatetimeIndex(pd.to_datetime(daily['day'].astype(str), format='%Y%m%d'), name='Date').tz_localize(self.tz)
+        hist = pd.DataFrame({column: daily[field] for field, column in BAR_COLUMNS.items()}, index=index)
+        hist['Volume'] = hist['Volume'].astype('int64')
+        return add_technical_indicators(hist)
+
+    def to_stock_data(self, tickers: List[str] = None) -> Dict:    # daily rollups in the FinancialDataCollector layout
+        stock_data = {}
+        for ticker in tickers or self.tickers():
+            hist = self.daily_bars(ticker)
+            if len(hist):
+                stock_data[ticker] = {'prices': hist, 'info': {}, 'sector': _sector_for(ticker)}
+        return stock_data
+
+
+def _sector_for(ticker: str) -> str:
+    for sector, tickers in SECTOR_MAPPING.items():
+        if ticker in tickers:
+            return sector
+    return 'Other'
+
+
+def ingest_intraday(tickers: List[str] = None, interval: str = '1m', period: str = None,
+                    store: IntradayStore = None) -> Dict[str, int]:       # stream Yahoo intraday bars into the store, one ticker at a time
+
+    import yfinance as yf
+
+    store = store or IntradayStore(interval=interval)
+    tickers = tickers or SP500_TOP_50
+    period = period or INTRADAY_INTERVALS[interval]
+    print(f"Ingesting {interval} bars for {len(tickers)} stocks into {store.path}...")
+
+    sessions = {}
+    for i, ticker in enumerate(tickers):
+        try:
+            bars = yf.Ticker(ticker).history(period=period, interval=interval)
+            sessions[ticker] = store.write(ticker, bars)
+            print(f"Processing {ticker} ({i+1}/{len(tickers)}): {len(bars)} bars, {sessions[ticker]} sessions")
+        except Exception as e:
+            print(f"Error collecting intraday data for {ticker}: {e}")
+    return sessions
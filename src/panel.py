@@ -0,0 +1,116 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# A PricePanel stores the whole universe as one array shaped (field, date, ticker) over a
+# single shared date index. Field and ticker frames are views into that array, so
+# cross-ticker work is plain array math and float32 storage halves the footprint.
+# `observed` marks the (date, ticker) cells that had a bar in the source data; it is what
+# lets the panel hand back each ticker's original index in to_stock_data().
+
+
+def _union_dates(indexes: List[pd.DatetimeIndex]) -> pd.DatetimeIndex:      # start from a real index so the timezone survives
+    if not indexes:
+        return pd.DatetimeIndex([], name='Date')
+    dates = indexes[0]
+    for index in indexes[1:]:
+        if not index.equals(dates):
+            dates = dates.union(index)
+    return dates
+
+
+class PricePanel:                   # aligned (field x date x ticker) price universe with zero-copy views
+
+    def __init__(self, dates: pd.DatetimeIndex, tickers: List[str], fields: List[str], values: np.ndarray,
+                 observed: np.ndarray = None, sectors: Dict[str, str] = None, info: Dict[str, Dict] = None):
+        if values.shape != (len(fields), len(dates), len(tickers)):
+            raise ValueError(f"values shape {values.shape} does not match "
+                             f"({len(fields)} fields, {len(dates)} dates, {len(tickers)} tickers)")
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self.values = values
+        if observed is None:            # best effort for arrays built elsewhere: a bar exists where any field is set
+            observed = ~np.isnan(values).all(axis=0)
+        self.observed = observed
+        self.sectors = sectors or {}
+        self.info = info or {}
+        self._field_pos = {f: i for i, f in enumerate(self.fields)}
+        self._ticker_pos = {t: j for j, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_stock_data(cls, stock_data: Dict, fields: List[str] = None, dtype=np.float64) -> 'PricePanel':
+
+        tickers = [t for t, data in stock_data.items() if 'prices' in data]
+        frames = [stock_data[t]['prices'] for t in tickers]
+        if fields is None:              # every numeric column, in first-seen order
+            fields = []
+            for prices in frames:
+                fields += [c for c in prices.select_dtypes('number').columns if c not in fields]
+
+        dates = _union_dates([prices.index for prices in frames])
+        values = np.full((len(fields), len(dates), len(tickers)), np.nan, dtype=dtype)
+        observed = np.zeros((len(dates), len(tickers)), dtype=bool)
+        for j, prices in enumerate(frames):
+            rows = slice(None) if prices.index.equals(dates) else dates.get_indexer(prices.index)
+            observed[rows, j] = True
+            for i, field in enumerate(fields):
+                if field in prices:
+                    values[i, rows, j] = prices[field].to_numpy(dtype=dtype)
+
+        return cls(dates, tickers, fields, values, observed,
+                   sectors={t: stock_data[t].get('sector', 'Other') for t in tickers},
+                   info={t: stock_data[t].get('info', {}) for t in tickers})
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.observed.nbytes
+
+    def astype(self, dtype) -> 'PricePanel':
+        if self.values.dtype == np.dtype(dtype):
+            return self
+        return PricePanel(self.dates, self.tickers, self.fields, self.values.astype(dtype), self.observed,
+                          self.sectors, self.info)
+
+    def field(self, field: str) -> np.ndarray:             # (date, ticker) array view
+        return self.values[self._field_pos[field]]
+
+    def missing(self, field: str = 'Close') -> np.ndarray:  # no bar for that date, or a bar without this field
+        return ~self.observed | np.isnan(self.field(field))
+
+    def field_frame(self, field: str, tickers: List[str] = None) -> pd.DataFrame:     # dates x tickers; a view unless tickers is given
+        if tickers is None:
+            return pd.DataFrame(self.field(field), index=self.dates, columns=self.tickers, copy=False)
+        columns = [self._ticker_pos[t] for t in tickers if t in self._ticker_pos]
+        return pd.DataFrame(self.field(field)[:, columns], index=self.dates,
+                            columns=[self.tickers[j] for j in columns], copy=False)
+
+    def ticker_frame(self, ticker: str, trim: bool = False) -> pd.DataFrame:        # dates x fields view of one ticker
+        j = self._ticker_pos[ticker]
+        frame = pd.DataFrame(self.values[:, :, j].T, index=self.dates, columns=self.fields, copy=False)
+        if trim and not self.observed[:, j].all():              # back to the ticker's own dates (copies)
+            frame = frame[self.observed[:, j]]
+        return frame
+
+    def to_stock_data(self) -> Dict:            # same shape as FinancialDataCollector.load_stock_data()
+        return {
+            ticker: {
+                'prices': self.ticker_frame(ticker, trim=True),
+                'info': self.info.get(ticker, {}),
+                'sector': self.sectors.get(ticker, 'Other')
+            }
+            for ticker in self.tickers
+        }
+
+    def select(self, tickers: List[str] = None, fields: List[str] = None) -> 'PricePanel':     # sub-panel (copies)
+        tickers = [t for t in (tickers or self.tickers) if t in self._ticker_pos]
+        fields = [f for f in (fields or self.fields) if f in self._field_pos]
+        columns = [self._ticker_pos[t] for t in tickers]
+        values = self.values[np.ix_([self._field_pos[f] for f in fields], np.arange(len(self.dates)), columns)]
+        return PricePanel(self.dates, tickers, fields, values, self.observed[:, columns],
+                          {t: self.sectors.get(t, 'Other') for t in tickers}, {t: self.info.get(t, {}) for t in tickers})
@@ -0,0 +1,150 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .panel import PricePanel
+
+# Range statistics over any [start, end] window without rescanning the data:
+#   - dates are int64 nanoseconds, located with np.searchsorted (O(log n))
+#   - prefix sums of returns, squared returns and valid-return counts give the mean and
+#     sample volatility of any window in O(1)
+#   - log closes plus previous/next valid-row pointers give total return in O(1)
+#   - per-ticker sparse tables (built on first use) give range high/low in O(1)
+# Rows are positions in the shared panel index; windows are half-open [i, j).
+
+TRADING_DAYS = 252
+STAT_COLUMNS = ['observations', 'mean_return', 'volatility', 'annual_return', 'annual_volatility', 'sharpe_ratio',
+                'total_return', 'first_close', 'last_close']
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:          # (n + 1, T) running sums with a zero first row
+    out = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype='float64')
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+class SparseTable:                  # idempotent range max/min: O(n log n) build, O(1) query
+
+    def __init__(self, values: np.ndarray, op=np.fmax):
+        self.op = op
+        self.levels = [values]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            self.levels.append(op(previous[:-width], previous[width:]))
+            width *= 2
+
+    def query(self, i: int, j: int) -> float:           # op over values[i:j], NaN for an empty range
+        if j <= i:
+            return np.nan
+        level = (j - i).bit_length() - 1
+        table = self.levels[level]
+        return float(self.op(table[i], table[j - (1 << level)]))
+
+
+class RangeStatsIndex:              # O(1) / O(log n) window statistics for every ticker in a panel
+
+    def __init__(self, dates: pd.DatetimeIndex, tickers: List[str], close: np.ndarray, returns: np.ndarray,
+                 observed: np.ndarray = None):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self._pos = {t: j for j, t in enumerate(self.tickers)}
+        self._keys = dates.as_unit('ns').asi8 if len(dates) else np.empty(0, dtype='int64')
+        self.close = np.asarray(close, dtype='float64')
+        observed = ~np.isnan(self.close) if observed is None else np.asarray(observed, dtype=bool)
+
+        returns = np.asarray(returns, dtype='float64')
+        valid = ~np.isnan(returns)
+        clean = np.where(valid, returns, 0.0)
+        self._sum = _prefix(clean)
+        self._sum_sq = _prefix(clean * clean)
+        self._count = _prefix(valid.astype('float64'))
+        self._bars = _prefix(observed.astype('float64'))            # rows each ticker actually traded, for tail windows
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._log_close = np.log(self.close)
+        rows = np.arange(len(dates))[:, None]
+        has_close = ~np.isnan(self.close)
+        # next_valid[i] = first row >= i with a close; prev_valid[j] = last row < j with a close
+        self._next_valid = np.minimum.accumulate(np.where(has_close, rows, len(dates))[::-1], axis=0)[::-1]
+        self._prev_valid = np.vstack([np.full((1, len(self.tickers)), -1),
+                                      np.maximum.accumulate(np.where(has_close, rows, -1), axis=0)])
+        self._high: Dict[str, SparseTable] = {}
+        self._low: Dict[str, SparseTable] = {}
+
+    @classmethod
+    def from_panel(cls, panel: PricePanel) -> 'RangeStatsIndex':
+        return cls(panel.dates, panel.tickers, panel.field('Close'), panel.field('Returns'), panel.observed)
+
+    def locate(self, start=None, end=None) -> Tuple[int, int]:      # rows covering start..end inclusive
+        i = 0 if start is None else int(np.searchsorted(self._keys, self._key(start), side='left'))
+        j = len(self._keys) if end is None else int(np.searchsorted(self._keys, self._key(end, end_of_day=True), side='right'))
+        return i, max(i, j)
+
+    def _key(self, when, end_of_day: bool = False) -> int:
+        when = pd.Timestamp(when)
+        if self.dates.tz is not None:
+            when = when.tz_convert(self.dates.tz) if when.tz is not None else when.tz_localize(self.dates.tz)
+        if end_of_day and when == when.normalize():          # a bare end date includes that whole day
+            when = when + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+        return when.as_unit('ns').value
+
+    def tail(self, ticker: str, rows: int) -> Tuple[int, int]:     # the ticker's last `rows` bars, like prices.tail(rows)
+        k = self._pos[ticker]
+        bars = self._bars[:, k]
+        total = bars[-1]
+        j = int(np.searchsorted(bars, total, side='left'))          # one past the ticker's last bar
+        i = int(np.searchsorted(bars, max(total - rows, 0), side='right')) - 1 if rows < total else 0
+        return i, j
+
+    def prior_close_row(self, ticker: str, i: int) -> int:      # last row before i with a close, -1 if none
+        return int(self._prev_valid[i, self._pos[ticker]])
+
+    def window_stats(self, ticker: str, i: int, j: int) -> Dict:       # all O(1) given the row bounds
+        k = self._pos[ticker]
+        n = self._count[j, k] - self._count[i, k]
+        total = self._sum[j, k] - self._sum[i, k]
+        mean = total / n if n else np.nan
+        var = (self._sum_sq[j, k] - self._sum_sq[i, k] - total * mean) / (n - 1) if n > 1 else np.nan
+        std = np.sqrt(max(var, 0.0)) if n > 1 else np.nan
+
+        first = self._next_valid[i, k] if i < len(self._keys) else len(self._keys)
+        last = self._prev_valid[j, k]
+        if first < j and last >= i:
+            total_return = np.exp(self._log_close[last, k] - self._log_close[first, k]) - 1
+        else:
+            total_return = np.nan
+        return {
+            'observations': int(n),
+            'mean_return': mean,
+            'volatility': std,
+            'annual_return': mean * TRADING_DAYS,
+            'annual_volatility': std * np.sqrt(TRADING_DAYS),
+            'sharpe_ratio': (mean * TRADING_DAYS) / (std * np.sqrt(TRADING_DAYS)) if std else 0.0,
+            'total_return': total_return,
+            'first_close': self.close[first, k] if first < j else np.nan,
+            'last_close': self.close[last, k] if last >= i else np.nan
+        }
+
+    def high_low(self, ticker: str, i: int, j: int) -> Tuple[float, float]:     # highest and lowest close in rows [i, j)
+        if ticker not in self._high:
+            k = self._pos[ticker]
+            self._high[ticker] = SparseTable(self.close[:, k], np.fmax)
+            self._low[ticker] = SparseTable(self.close[:, k], np.fmin)
+        return self._high[ticker].query(i, j), self._low[ticker].query(i, j)
+
+    def stats(self, tickers: List[str] = None, start=None, end=None, last_rows: int = None,
+              high_low: bool = False) -> pd.DataFrame:      # one row of window statistics per ticker
+
+        tickers = self.tickers if tickers is None else [t for t in tickers if t in self._pos]
+        if not tickers:                                     # an empty selection means no rows, not every ticker
+            return pd.DataFrame(columns=STAT_COLUMNS + (['high', 'low'] if high_low else []), dtype='float64')
+        bounds = self.locate(start, end)
+        rows = {}
+        for ticker in tickers:
+            i, j = self.tail(ticker, last_rows) if last_rows is not None else bounds
+            rows[ticker] = self.window_stats(ticker, i, j)
+            if high_low:
+                rows[ticker]['high'], rows[ticker]['low'] = self.high_low(ticker, i, j)
+        return pd.DataFrame.from_dict(rows, orient='index')
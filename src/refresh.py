@@ -0,0 +1,163 @@
+import asyncio
+import random
+import signal
+import time
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+from pandas.tseries.holiday import (AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay, USPresidentsDay,
+                                    USThanksgivingDay, nearest_workday, sunday_to_monday)
+
+from .data_collection import FinancialDataCollector, compute_data_version
+from .shared_data import SharedDataPublisher
+
+EXCHANGE_TZ = 'America/New_York'
+MARKET_CLOSE = '16:00'
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):        # full-day closures; early closes still settle at 16:00 for our purposes
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),    # a Saturday New Year is not moved back
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+class MarketCalendar:               # trading sessions and their close times in exchange time
+
+    def __init__(self, tz: str = EXCHANGE_TZ, close: str = MARKET_CLOSE):
+        self.tz = tz
+        self.close = pd.Timedelta(f"{close}:00")
+        self._holidays = {}
+
+    def is_trading_day(self, day: pd.Timestamp) -> bool:
+        day = pd.Timestamp(day).normalize()
+        if day.dayofweek >= 5:
+            return False
+        if day.year not in self._holidays:
+            self._holidays[day.year] = set(NYSEHolidayCalendar().holidays(f"{day.year}-01-01", f"{day.year}-12-31").date)
+        return day.date() not in self._holidays[day.year]
+
+    def session_close(self, day: pd.Timestamp) -> pd.Timestamp:
+        return pd.Timestamp(pd.Timestamp(day).date()).tz_localize(self.tz) + self.close
+
+    def last_session(self, now: pd.Timestamp) -> pd.Timestamp:      # most recent session whose close has passed
+        now = now.tz_convert(self.tz)
+        day = now.normalize().tz_localize(None)
+        while not self.is_trading_day(day) or self.session_close(day) > now:
+            day -= pd.Timedelta(days=1)
+        return day
+
+    def next_close(self, now: pd.Timestamp) -> pd.Timestamp:        # next session close strictly after now
+        now = now.tz_convert(self.tz)
+        day = now.normalize().tz_localize(None)
+        while not self.is_trading_day(day) or self.session_close(day) <= now:
+            day += pd.Timedelta(days=1)
+        return self.session_close(day)
+
+
+class RefreshScheduler:             # collect after each close, publish a new shared-data version, retry with backoff
+
+    def __init__(self, publisher: SharedDataPublisher = None, collect: Callable[[], Dict] = None,
+                 calendar: MarketCalendar = None, settle_minutes: float = 30, jitter_seconds: float = 300,
+                 backoff_seconds: float = 60, max_backoff_seconds: float = 3600, max_attempts: int = 8):
+        self.publisher = publisher or SharedDataPublisher()
+        self.collect = collect or (lambda: FinancialDataCollector().collect_stock_data())
+        self.calendar = calendar or MarketCalendar()
+        self.settle = pd.Timedelta(minutes=settle_minutes)      # Yahoo needs a while after the bell to finalize bars
+        self.jitter_seconds = jitter_seconds                    # spread several schedulers so they do not crawl in lockstep
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_attempts = max_attempts
+        self.last_version: Optional[str] = None
+        self._stop = asyncio.Event()
+
+    def next_run(self, now: pd.Timestamp = None) -> pd.Timestamp:
+        now = now or pd.Timestamp.now(tz=self.calendar.tz)
+        close = self.calendar.next_close(now - self.settle)
+        return close + self.settle + pd.Timedelta(seconds=random.uniform(0, self.jitter_seconds))
+
+    def _backoff(self, attempt: int) -> float:          # exponential with full jitter
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def refresh_once(self, now: pd.Timestamp = None) -> Optional[str]:     # blocking; returns the published version or None if stale
+
+        session = self.calendar.last_session(now or pd.Timestamp.now(tz=self.calendar.tz))
+        stock_data = self.collect()
+        if not stock_data:
+            raise RuntimeError("Collector returned no data")
+
+        latest = max(data['prices'].index[-1] for data in stock_data.values() if len(data.get('prices', [])))
+        if latest.tz is not None:
+            latest = latest.tz_convert(self.calendar.tz)
+        if latest.date() < session.date():
+            print(f"Data ends {latest.date()}, session {session.date()} not available yet")
+            return None
+
+        version = compute_data_version(stock_data)
+        if version == self.last_version:
+            print(f"Data version {version} unchanged, nothing to publish")
+            return version
+        self.publisher.publish(stock_data, version)
+        self.last_version = version
+        return version
+
+    async def refresh_with_retries(self) -> Optional[str]:
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_attempts):
+            started = time.perf_counter()
+            try:
+                version = await loop.run_in_executor(None, self.refresh_once)      # the collector blocks on HTTP
+                if version is not None:
+                    print(f"Refresh finished in {time.perf_counter() - started:.1f}s (version {version})")
+                    return version
+            except Exception as e:
+                print(f"Refresh attempt {attempt + 1} failed: {type(e).__name__}: {e}")
+            delay = self._backoff(attempt)
+            print(f"Retrying in {delay:.0f}s")
+            if await self._sleep(delay):
+                return None
+        print(f"Giving up after {self.max_attempts} attempts until the next session")
+        return None
+
+    async def _sleep(self, seconds: float) -> bool:        # True when stop() was called while waiting
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=max(seconds, 0))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def run(self, run_now: bool = False):
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):      # Windows / non-main thread
+                pass
+
+        if run_now:
+            await self.refresh_with_retries()
+        while not self._stop.is_set():
+            when = self.next_run()
+            print(f"Next refresh at {when:%Y-%m-%d %H:%M:%S %Z}")
+            # sleep in bounded steps so suspend/resume or clock changes cannot overshoot by hours
+            while not self._stop.is_set():
+                remaining = (when - pd.Timestamp.now(tz=when.tz)).total_seconds()
+                if remaining <= 0 or await self._sleep(min(remaining, 300)):
+                    break
+            if not self._stop.is_set():
+                await self.refresh_with_retries()
+        print("Refresh scheduler stopped")
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .panel import PricePanel
+
+FREQUENCIES = {'W': 'W-FRI', 'M': 'ME', 'Q': 'QE', 'Y': 'YE'}       # period-end labels, pandas >= 2.2 aliases
+FREQUENCY_NAMES = {'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly', 'Q': 'Quarterly', 'Y': 'Yearly'}
+OHLCV_AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _aggregate(daily: Dict[str, pd.DataFrame], rule: str) -> Dict[str, pd.DataFrame]:     # one resample pass per field over all tickers
+
+    bars = {}
+    for field, how in OHLCV_AGGREGATIONS.items():
+        if field not in daily:
+            continue
+        resampler = daily[field].resample(rule)
+        bars[field] = resampler.sum(min_count=1) if how == 'sum' else getattr(resampler, how)()
+    return bars
+
+
+def _changed_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:     # per-row inequality with NaN == NaN, without isnan temporaries
+    unsigned = np.dtype(f'u{a.dtype.itemsize}')
+    return (a.view(unsigned) != b.view(unsigned)).any(axis=1)
+
+
+def _rows(daily: Dict[str, pd.DataFrame], after, through) -> Dict[str, pd.DataFrame]:     # daily bars dated in (after, through]
+    dates = daily['Close'].index.normalize()
+    mask = np.ones(len(dates), dtype=bool)
+    if after is not None:
+        mask &= dates > after
+    if through is not None:
+        mask &= dates <= through
+    return {field: frame[mask] for field, frame in daily.items()}
+
+
+class ResamplingEngine:             # W/M/Q/Y OHLCV bars and period returns for the whole universe, cached per frequency
+
+    def __init__(self, daily: Dict[str, pd.DataFrame]):
+        self.daily = daily                          # field -> dates x tickers frame of daily bars
+        self._cache: Dict[str, Dict[str, pd.DataFrame]] = {}
+
+    @classmethod
+    def from_panel(cls, panel: PricePanel) -> 'ResamplingEngine':       # zero-copy field frames over the panel
+        return cls({field: panel.field_frame(field) for field in OHLCV_AGGREGATIONS if field in panel.fields})
+
+    @classmethod
+    def from_stock_data(cls, stock_data: Dict) -> 'ResamplingEngine':
+        return cls.from_panel(PricePanel.from_stock_data(stock_data, list(OHLCV_AGGREGATIONS)))
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.daily['Close'].columns)
+
+    def get(self, freq: str) -> Dict[str, pd.DataFrame]:        # field -> periods x tickers, plus period 'Returns'
+
+        if freq not in self._cache:
+            bars = _aggregate(self.daily, FREQUENCIES[freq])
+            bars['Returns'] = bars['Close'].pct_change(fill_method=None)
+            self._cache[freq] = bars
+        return self._cache[freq]
+
+    def ticker_bars(self, ticker: str, freq: str) -> pd.DataFrame:     # OHLCV + Returns for one ticker at freq
+        bars = self.get(freq)
+        return pd.DataFrame({field: frame[ticker] for field, frame in bars.items()}).dropna(subset=['Close'])
+
+    def extend(self, daily: Dict[str, pd.DataFrame]) -> Optional['ResamplingEngine']:     # engine over `daily` reusing settled periods
+
+        # `daily` is the next refresh of the same universe: typically a rolling window that dropped
+        # its oldest bars, appended new ones and may have revised some (dividend adjustment). Cached
+        # periods between the new first bar and the first changed or added bar are reused; the
+        # periods on either side are re-aggregated. A new engine is returned so a snapshot still
+        # serving requests keeps its own. None when the tickers or fields differ or the history was
+        # truncated: rebuild instead.
+        old = self.daily['Close']
+        new = daily['Close']
+        if list(new.columns) != list(old.columns) or set(daily) != set(self.daily) or not len(new) or not len(old):
+            return None
+        if old.index[-1] > new.index[-1]:               # history was cut short, not rolled forward
+            return None
+
+        dropped = int(old.index.searchsorted(new.index[0]))     # old bars that fell off the front of the window
+        overlap = min(len(old) - dropped, len(new))
+        old_rows = slice(dropped, dropped + overlap)            # views, the comparison below is the only full pass
+        changed = new.index[:overlap] != old.index[old_rows]
+        for field, frame in self.daily.items():
+            old_values, new_values = frame.to_numpy()[old_rows], daily[field].to_numpy()[:overlap]
+            if old_values.dtype != new_values.dtype:
+                return None
+            changed |= _changed_rows(old_values, new_values)
+        first_changed = int(np.argmax(changed)) if changed.any() else overlap
+
+        engine = ResamplingEngine(daily)
+        first = new.index[0].normalize()
+        changed_at = new.index[first_changed].normalize() if first_changed < len(new) else None
+        for freq, cached in self._cache.items():
+            labels = cached['Close'].index              # period-end dates
+            reused = np.ones(len(labels), dtype=bool) if changed_at is None else labels < changed_at
+            head = None
+            if dropped:                                 # the period holding the new first bar lost bars off the front
+                head = labels[labels >= first][:1]
+                reused &= labels > (head[0] if len(head) else labels[-1])
+            if not reused.any():
+                bars = _aggregate(daily, FREQUENCIES[freq])
+            else:
+                settled = labels[reused]
+                parts = [] if head is None else [_aggregate(_rows(daily, None, head[0]), FREQUENCIES[freq])]
+                parts.append({field: frame[reused] for field, frame in cached.items()})
+                tail = _rows(daily, settled[-1], None)
+                if len(tail['Close']):
+                    parts.append(_aggregate(tail, FREQUENCIES[freq]))
+                bars = {field: pd.concat([part[field] for part in parts]) for field in parts[-1] if field != 'Returns'}
+            bars['Returns'] = bars['Close'].pct_change(fill_method=None)
+            engine._cache[freq] = bars
+        return engine
+
+    def long_table(self, freq: str) -> pd.DataFrame:        # tidy (period, ticker) rows for exports
+        bars = self.get(freq)
+        close = bars['Close']
+        index = pd.MultiIndex.from_product([close.index, close.columns], names=['Date', 'Ticker'])
+        table = pd.DataFrame({field: frame.to_numpy().ravel() for field, frame in bars.items()}, index=index)
+        return table.dropna(subset=['Close']).reset_index()
@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import PROCESSED_DATA_DIR
+from .data_collection import compute_data_version
+from .panel import PricePanel
+
+# Layout of a published version directory:
+#   values.npy   float array shaped (field, date, ticker), memory-mapped read-only by workers
+#   dates.npy    int64 nanoseconds since epoch (UTC)
+#   observed.npy bool array shaped (date, ticker), True where the ticker had a bar
+#   meta.json    tickers, fields, timezone, sectors and company info
+# The CURRENT file in the store root names the version workers should serve. Publishing
+# writes a complete version directory first and then swaps CURRENT with os.replace, so a
+# reader either sees the old version or the new one, never a partial write.
+
+SHARED_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Returns', 'Volatility', 'MA_20', 'MA_50', 'RSI']
+SHARED_DATA_DIR = os.path.join(PROCESSED_DATA_DIR, 'shared')
+
+
+class SharedDataset(PricePanel):    # read-only, zero-copy panel over one published version
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        dates = pd.DatetimeIndex(np.load(os.path.join(path, 'dates.npy')).view('datetime64[ns]'), name='Date')
+        if meta.get('tz'):
+            dates = dates.tz_localize('UTC').tz_convert(meta['tz'])
+        observed_path = os.path.join(path, 'observed.npy')
+        observed = np.load(observed_path, mmap_mode='r') if os.path.exists(observed_path) else None
+
+        super().__init__(dates, meta['tickers'], meta['fields'], values, observed, meta['sectors'], meta['info'])
+
+
+class SharedDataPublisher:          # loader side: materializes stock data into a versioned, memory-mappable store
+
+    def __init__(self, root: str = None, keep_versions: int = 2):
+        self.root = root or SHARED_DATA_DIR
+        self.versions_dir = os.path.join(self.root, 'versions')
+        self.keep_versions = keep_versions
+
+    def publish(self, stock_data: Dict, version: str = None, dtype=np.float64) -> str:
+
+        version = version or compute_data_version(stock_data)
+        target = os.path.join(self.versions_dir, version)
+
+        if not os.path.isdir(target):
+            staging = os.path.join(self.versions_dir, f".staging-{version}-{os.getpid()}")
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+
+            panel = stock_data if isinstance(stock_data, PricePanel) else \
+                PricePanel.from_stock_data(stock_data, SHARED_FIELDS, dtype)
+            out = np.lib.format.open_memmap(os.path.join(staging, 'values.npy'), mode='w+',
+                                            dtype=panel.dtype, shape=panel.values.shape)
+            out[:] = panel.values
+            out.flush()
+            del out
+            np.save(os.path.join(staging, 'observed.npy'), np.ascontiguousarray(panel.observed))
+
+            dates = panel.dates
+            utc = dates.tz_convert('UTC').tz_localize(None) if dates.tz is not None else dates
+            np.save(os.path.join(staging, 'dates.npy'), utc.as_unit('ns').asi8)
+            meta = {
+                'version': version,
+                'tickers': panel.tickers,
+                'fields': panel.fields,
+                'tz': str(dates.tz) if dates.tz is not None else None,
+                'sectors': panel.sectors,
+                'info': panel.info
+            }
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump(meta, f, default=str)
+
+            os.replace(staging, target)
+
+        self._set_current(version)
+        self._prune(version)
+        print(f"Published shared data version {version} to {target}")
+        return version
+
+    def _set_current(self, version: str):          # atomic pointer swap
+        tmp = os.path.join(self.root, f".CURRENT.{os.getpid()}")
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.root, 'CURRENT'))
+
+    def _prune(self, current: str):        # attached workers keep their mappings alive after unlink on POSIX
+        versions = [v for v in os.listdir(self.versions_dir) if not v.startswith('.')]
+        versions.sort(key=lambda v: os.path.getmtime(os.path.join(self.versions_dir, v)), reverse=True)
+        for old in [v for v in versions if v != current][max(self.keep_versions - 1, 0):]:
+            shutil.rmtree(os.path.join(self.versions_dir, old), ignore_errors=True)
+
+
+class SharedDataReader:             # worker side: attaches to whatever version CURRENT points at
+
+    def __init__(self, root: str = None):
+        self.root = root or SHARED_DATA_DIR
+        self._dataset: Optional[SharedDataset] = None
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def attach(self) -> SharedDataset:          # reuse the mapping until a newer version is published
+
+        version = self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No shared data published under {self.root}")
+        if self._dataset is None or self._dataset.version != version:
+            self._dataset = SharedDataset(os.path.join(self.root, 'versions', version), version)
+        return self._dataset
+
+    def has_update(self) -> bool:
+        return self._dataset is not None and self.current_version() not in (None, self._dataset.version)
+
+
+if __name__ == "__main__":
+    from .data_collection import FinancialDataCollector
+
+    stock_data = FinancialDataCollector().load_stock_data()
+    SharedDataPublisher().publish(stock_data)
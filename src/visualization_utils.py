@@ -1,18 +1,29 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import numpy as np
+import os
+import time
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Dict, Tuple
-from config import COLOR_PALETTE, PLOT_STYLE
+from .config import COLOR_PALETTE, PLOT_STYLE, RAW_DATA_DIR, SECTOR_MAPPING, ensure_dir
+
+SAVE_MODES = {                                      # preview for quick iteration, publication for reports
+    'preview': {'dpi': 72},
+    'publication': {'dpi': 300, 'bbox_inches': 'tight'}
+}
 
 class VisualizationUtils:           # utility functions for creating visulaizations
 
     def __init__(self):
+        import matplotlib.pyplot as plt                 # plotting stack is only imported once something is drawn
+        import seaborn as sns
+
         plt.style.use(PLOT_STYLE)
         sns.set_palette(COLOR_PALETTE)
 
     @staticmethod
     def setup_plot_style():                 # setup consistent plot styling
+        import matplotlib.pyplot as plt
         plt.rcParams.update({
             'figure.figsize': (12, 8),
             'font.size': 10,
@@ -26,6 +37,7 @@ class VisualizationUtils:           # utility functions for creating visulaizati
 
     @staticmethod
     def create_subplot_grid(nrows: int, ncols: int, figsize: Tuple[int, int] = (15, 10)):       # create a subplot grid with consistent styling
+        import matplotlib.pyplot as plt
         fig, axes = plt.subplots(nrows, ncols, figsize=figsize)
         fig.suptitle('Financial Market Analysis', fontsize=16, y=0.98)
         plt.tight_layout()
@@ -33,10 +45,11 @@ class VisualizationUtils:           # utility functions for creating visulaizati
     
     @staticmethod
     def format_currency_axis(ax, axis: str = 'y'):              # format axis to display currency values
+        from matplotlib.ticker import FuncFormatter
         if axis == 'y':
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+            ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
         else:
-            ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+            ax.xaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
 
     @staticmethod
     def add_recession_shading(ax, start_dates: List[str], end_dates: List[str]):        # add recession period shading to plots.  
@@ -46,14 +59,148 @@ class VisualizationUtils:           # utility functions for creating visulaizati
 
 
     @staticmethod
-    def save_plot(fig, filename: str, directory: str = 'static/images'):            # aave plot to specified directory.
-        import os
-        os.makedirs(directory, exist_ok=True)
+    def save_plot(fig, filename: str, directory: str = 'static/images', mode: str = 'publication'):    # aave plot to specified directory.
+        ensure_dir(directory)
         filepath = os.path.join(directory, filename)
-        fig.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {filepath}")  
-    
+        tmp_path = os.path.join(directory, f".{filename}.tmp{os.path.splitext(filename)[1]}")
+        fig.savefig(tmp_path, **SAVE_MODES[mode])
+        os.replace(tmp_path, filepath)                  # never leave a truncated image behind after a crash
+        print(f"Plot saved to {filepath}")
 
 
-    
+# Batch report rendering. Each worker process loads the data once, draws on the
+# non-interactive Agg backend and keeps one figure per layout alive between charts.
+
+CHART_LAYOUTS = {
+    'price': (2, 1, (12, 8), [3, 1]),           # nrows, ncols, figsize, height ratios
+    'returns': (1, 1, (10, 6), None),
+    'sector': (1, 1, (12, 6), None)
+}
+
+_worker = {}
+
+
+def _init_render_worker(data_path: str, mode: str):
+    import matplotlib
+    matplotlib.use('Agg')
+    VisualizationUtils()
+    VisualizationUtils.setup_plot_style()
+
+    with open(data_path, 'rb') as f:
+        stock_data = pickle.load(f)
+    _worker.update({'stock_data': stock_data, 'mode': mode, 'figures': {}})
+
+
+def _layout_figure(layout: str):                    # reuse figure/axes for charts with the same layout
+    figures = _worker['figures']
+    if layout not in figures:
+        import matplotlib.pyplot as plt
+        nrows, ncols, figsize, ratios = CHART_LAYOUTS[layout]
+        fig, axes = plt.subplots(nrows, ncols, figsize=figsize, squeeze=False,
+                                 gridspec_kw={'height_ratios': ratios} if ratios else None)
+        figures[layout] = (fig, axes.ravel())
+    fig, axes = figures[layout]
+    for ax in axes:
+        ax.clear()
+    return fig, axes
+
+
+def _draw_price(axes, stock_data: Dict, ticker: str):
+    prices = stock_data[ticker]['prices']
+    axes[0].plot(prices.index, prices['Close'], label='Close', linewidth=1.5)
+    axes[0].plot(prices.index, prices['MA_20'], label='MA 20', linewidth=1)
+    axes[0].plot(prices.index, prices['MA_50'], label='MA 50', linewidth=1)
+    axes[0].set_title(f'{ticker} - Price and Moving Averages')
+    axes[0].legend(loc='upper left')
+    VisualizationUtils.format_currency_axis(axes[0])
+    axes[1].bar(prices.index, prices['Volume'], color=COLOR_PALETTE[0], width=1.0)
+    axes[1].set_ylabel('Volume')
+
+
+def _draw_returns(axes, stock_data: Dict, ticker: str):
+    returns = stock_data[ticker]['prices']['Returns'].dropna() * 100
+    axes[0].hist(returns, bins=50, color=COLOR_PALETTE[0], alpha=0.8)
+    axes[0].axvline(returns.mean(), color=COLOR_PALETTE[3], linestyle='--', label=f'Mean {returns.mean():.2f}%')
+    axes[0].set_title(f'{ticker} - Daily Returns Distribution')
+    axes[0].set_xlabel('Daily Return (%)')
+    axes[0].legend()
+
+
+def _draw_sector(axes, stock_data: Dict, sector: str):
+    for ticker in SECTOR_MAPPING.get(sector, []):
+        if ticker in stock_data:
+            close = stock_data[ticker]['prices']['Close'].dropna()
+            axes[0].plot(close.index, close / close.iloc[0] * 100, label=ticker, linewidth=1.2)
+    axes[0].set_title(f'{sector} - Normalized Performance (Base=100)')
+    axes[0].legend(loc='upper left', ncol=2)
+
+
+CHART_RENDERERS = {'price': _draw_price, 'returns': _draw_returns, 'sector': _draw_sector}
+
+
+def _render_job(job: Tuple[str, str, str, str]) -> Tuple[str, float]:
+    kind, key, directory, filename = job
+    started = time.perf_counter()
+    fig, axes = _layout_figure(kind)
+    CHART_RENDERERS[kind](axes, _worker['stock_data'], key)
+    fig.suptitle('Financial Market Analysis', fontsize=16)
+    VisualizationUtils.save_plot(fig, filename, directory, _worker['mode'])
+    return filename, time.perf_counter() - started
+
+
+class BatchReportRenderer:          # render per-ticker and per-sector chart packs across a process pool, resumably
+
+    MANIFEST = '_completed.txt'
+
+    def __init__(self, output_dir: str = 'static/images/reports', data_path: str = None,
+                 mode: str = 'publication', max_workers: int = None):
+        self.output_dir = output_dir
+        self.data_path = data_path or os.path.join(RAW_DATA_DIR, 'stock_data.pkl')
+        self.mode = mode
+        self.max_workers = max_workers
+
+    def plan(self, tickers: List[str], sectors: List[str] = None,
+             ticker_charts: List[str] = ('price', 'returns')) -> List[Tuple[str, str, str, str]]:
+        jobs = [(kind, ticker, self.output_dir, f"{kind}_{ticker}.png") for ticker in tickers for kind in ticker_charts]
+        jobs += [('sector', sector, self.output_dir, f"sector_{sector.replace(' ', '_')}.png")
+                 for sector in (sectors or [])]
+        jobs.sort(key=lambda job: job[0])               # group by layout so workers reuse figures
+        return jobs
+
+    def _completed(self) -> set:
+        manifest = os.path.join(self.output_dir, self.MANIFEST)
+        if not os.path.exists(manifest):
+            return set()
+        with open(manifest) as f:
+            done = {line.strip() for line in f if line.strip()}
+        return {name for name in done if os.path.exists(os.path.join(self.output_dir, name))}
+
+    def render(self, tickers: List[str], sectors: List[str] = None) -> Tuple[Dict[str, float], Dict[str, str]]:     # (timings, failures) by filename
+
+        ensure_dir(self.output_dir)
+        completed = self._completed()
+        jobs = [job for job in self.plan(tickers, sectors) if job[3] not in completed]
+        print(f"Rendering {len(jobs)} charts ({len(completed)} already done) in {self.mode} mode...")
 
+        timings, failures = {}, {}
+        manifest = open(os.path.join(self.output_dir, self.MANIFEST), 'a')
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_render_worker,
+                                     initargs=(self.data_path, self.mode)) as executor:
+                futures = {executor.submit(_render_job, job): job for job in jobs}
+                for future in as_completed(futures):
+                    filename = futures[future][3]
+                    try:
+                        _, elapsed = future.result()
+                    except Exception as e:              # one bad chart must not stop the batch; a rerun retries it
+                        print(f"Error rendering {filename}: {e!r}")
+                        failures[filename] = repr(e)
+                        continue
+                    manifest.write(filename + '\n')
+                    manifest.flush()                    # checkpoint so a rerun skips finished charts
+                    timings[filename] = elapsed
+        finally:
+            manifest.close()
+        if failures:
+            print(f"{len(failures)} of {len(jobs)} charts failed")
+        return timings, failures
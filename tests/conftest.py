@@ -0,0 +1,51 @@
+import atexit
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Set before src.config is imported: anything persisted during tests (e.g. GARCH params from
+# DataSnapshot.warm) lands in a throwaway data root instead of the repository's data/
+os.environ['MARKET_DATA_DIR'] = tempfile.mkdtemp(prefix='market-data-')
+atexit.register(shutil.rmtree, os.environ['MARKET_DATA_DIR'], ignore_errors=True)
+
+from src.data_collection import add_technical_indicators
+
+FIXTURE_TICKERS = {'AAPL': 'Technology', 'MSFT': 'Technology', 'JPM': 'Financial', 'XOM': 'Energy'}
+
+
+def make_stock_data(tickers=FIXTURE_TICKERS, days: int = 300, seed: int = 0) -> dict:     # small synthetic universe in the collector layout
+
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=days, name='Date').tz_localize('America/New_York')
+    stock_data = {}
+    for ticker, sector in tickers.items():
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, days)))
+        hist = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.002, days)),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 5_000_000, days),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=dates)
+        stock_data[ticker] = {'prices': add_technical_indicators(hist), 'info': {'longName': ticker}, 'sector': sector}
+    return stock_data
+
+
+@pytest.fixture
+def market_data_dir(tmp_path):      # MARKET_DATA_DIR layout with raw/stock_data.pkl
+    raw = tmp_path / 'data' / 'raw'
+    raw.mkdir(parents=True)
+    with open(raw / 'stock_data.pkl', 'wb') as f:
+        pickle.dump(make_stock_data(), f)
+    return str(tmp_path / 'data')
@@ -0,0 +1,94 @@
+import asyncio
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+pa = pytest.importorskip('pyarrow')
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from conftest import make_stock_data
+from src.api import ARROW_MEDIA_TYPE, AnalyticsAPI
+from src.dashboard_state import DashboardState
+
+
+@pytest.fixture(scope='module')
+def state():
+    state = DashboardState(lambda: make_stock_data(days=200))
+    state.load()
+    return state
+
+
+def call(state, *requests):     # run (path, headers) requests against a fresh API; returns [(status, headers, body)], api
+    api = AnalyticsAPI(state, max_workers=2)
+
+    async def run():
+        async with TestClient(TestServer(api.make_app())) as client:
+            responses = []
+            for path, headers in requests:
+                response = await client.get(path, headers=headers, auto_decompress=False)
+                responses.append((response.status, response.headers, await response.read()))
+            return responses
+    try:
+        return asyncio.run(run()), api
+    finally:
+        api.executor.shutdown()
+
+
+def read_arrow(body: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(body).read_all().to_pandas()
+
+
+def test_arrow_prices_round_trip(state):
+
+    responses, _ = call(state, ('/prices?tickers=MSFT,JPM&fields=Close,Volume&start=2023-03-01&end=2023-03-31',
+                                {'Accept': ARROW_MEDIA_TYPE}))
+    status, headers, body = responses[0]
+    assert status == 200 and headers['Content-Type'] == ARROW_MEDIA_TYPE
+    frame = read_arrow(body)
+
+    stock_data = state.snapshot().stock_data
+    for ticker in ['MSFT', 'JPM']:
+        expected = stock_data[ticker]['prices'].loc['2023-03-01':'2023-03-31', ['Close', 'Volume']]
+        rows = frame[frame['Ticker'] == ticker]
+        np.testing.assert_array_equal(rows['Close'].to_numpy(), expected['Close'].to_numpy())
+        np.testing.assert_array_equal(rows['Volume'].to_numpy(), expected['Volume'].to_numpy())
+        assert pd.DatetimeIndex(rows['Date']).equals(expected.index.rename('Date'))
+    assert frame['Volume'].dtype == 'int64'
+
+
+def test_json_matches_arrow(state):
+
+    path = '/risk?tickers=AAPL,XOM'
+    responses, _ = call(state, (path + '&format=arrow', {}), (path, {'Accept-Encoding': 'gzip'}))
+    (_, _, arrow_body), (status, headers, json_body) = responses
+    assert status == 200 and headers['Content-Encoding'] == 'gzip'
+    from_json = pd.DataFrame(json.loads(gzip.decompress(json_body)))
+    pd.testing.assert_frame_equal(from_json, read_arrow(arrow_body), check_dtype=False)
+
+
+def test_etag_revalidation_and_cache(state):
+
+    path = '/correlations?tickers=AAPL,MSFT,JPM&format=arrow'
+    responses, api = call(state, (path, {}), (path, {}))
+    (_, first, body), (_, second, again) = responses
+    assert first['ETag'] == second['ETag'] and body == again
+    assert first['X-Data-Version'] == state.snapshot().version
+    assert api.counters['computed'] == 1 and api.counters['cache_hits'] == 1
+
+    responses, api = call(state, (path, {'If-None-Match': first['ETag']}),
+                          ('/correlations?tickers=AAPL,MSFT&format=arrow', {'If-None-Match': first['ETag']}))
+    (status, headers, body), (other_status, _, _) = responses
+    assert status == 304 and body == b'' and headers['ETag'] == first['ETag']
+    assert other_status == 200                                  # a different query is a different entity
+    assert api.counters['not_modified'] == 1 and api.counters['computed'] == 1
+
+
+def test_bad_queries_are_400(state):
+    responses, api = call(state, ('/prices?tickers=NOPE', {}), ('/prices?fields=Nope', {}), ('/risk?format=xml', {}))
+    assert [status for status, _, _ in responses] == [400, 400, 400]
+    assert 'NOPE' in json.loads(responses[0][2])['error']
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from conftest import make_stock_data
+from src.bi_warehouse import BIWarehouse
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    warehouse = BIWarehouse(str(tmp_path / 'bi_warehouse.db'))
+    yield warehouse
+    warehouse.close()
+
+
+def test_reload_is_idempotent(warehouse):
+
+    stock_data = make_stock_data(days=200)
+    assert warehouse.load(stock_data) == 4 * 200
+    before = warehouse.query("SELECT COUNT(*), SUM(close), SUM(volume) FROM fact_daily_bar")
+    warehouse.load(stock_data)
+
+    assert warehouse.query("SELECT COUNT(*), SUM(close), SUM(volume) FROM fact_daily_bar") == before
+    assert warehouse.query("SELECT COUNT(*) FROM dim_company") == [(4,)]
+    assert warehouse.query("SELECT COUNT(*) FROM dim_date") == [(200,)]
+
+
+def test_reload_upserts_revised_and_new_bars(warehouse):
+
+    stock_data = make_stock_data(days=200)
+    warehouse.load({t: dict(d, prices=d['prices'].iloc[:150]) for t, d in stock_data.items()})
+    revised = make_stock_data(days=200)
+    revised['AAPL']['prices']['Close'] *= 2
+    warehouse.load(revised)
+
+    assert warehouse.query("SELECT COUNT(*) FROM fact_daily_bar") == [(4 * 200,)]
+    history = warehouse.ticker_history('AAPL', '2023-01-01', '2030-12-31')
+    np.testing.assert_allclose([row[1] for row in history], revised['AAPL']['prices']['Close'])
+
+
+def test_reload_drops_the_legacy_index(warehouse):
+
+    stock_data = make_stock_data(days=50)
+    warehouse.load(stock_data)
+    warehouse.conn.execute("CREATE INDEX idx_fact_ticker_date ON fact_daily_bar (ticker, date_key)")     # as older files have
+    warehouse.load(stock_data)
+
+    indexes = {row[0] for row in warehouse.query("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'fact_daily_bar'")}
+    assert 'idx_fact_ticker_date' not in indexes and {'idx_fact_sector_date', 'idx_fact_date'} <= indexes
+
+
+def test_missing_volumes_load_as_null(warehouse):
+
+    stock_data = make_stock_data(days=50)
+    prices = stock_data['XOM']['prices'] = stock_data['XOM']['prices'].astype({'Volume': 'float64'})
+    prices.iloc[3, prices.columns.get_loc('Volume')] = np.nan
+    warehouse.load(stock_data)
+    assert warehouse.query("SELECT COUNT(*) FROM fact_daily_bar WHERE volume IS NULL") == [(1,)]
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def data_dir_from(cwd, **overrides) -> str:   # src.config.DATA_DIR as a process started in `cwd` sees it
+    env = {key: value for key, value in os.environ.items() if key != 'MARKET_DATA_DIR'}
+    env.update(PYTHONPATH=PROJECT_ROOT, **overrides)
+    result = subprocess.run([sys.executable, '-c', 'from src.config import DATA_DIR; print(DATA_DIR)'],
+                            cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_default_data_dir_does_not_depend_on_the_working_directory(tmp_path):
+    expected = os.path.join(PROJECT_ROOT, 'data')
+    assert data_dir_from(PROJECT_ROOT) == expected
+    assert data_dir_from(os.path.join(PROJECT_ROOT, 'dashboards', 'dash_app')) == expected
+    assert data_dir_from(tmp_path) == expected
+
+
+def test_relative_market_data_dir_is_made_absolute(tmp_path):
+    assert data_dir_from(tmp_path, MARKET_DATA_DIR='store') == str(tmp_path / 'store')
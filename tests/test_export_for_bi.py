@@ -0,0 +1,82 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import make_stock_data
+from src.config import SECTOR_MAPPING
+from src.export_for_bi import MASTER_COLUMNS, write_master_table
+
+
+def reference_master_rows(stock_data) -> pd.DataFrame:      # the original row-by-row export loop
+    rows = []
+    for ticker, data in stock_data.items():
+        info = data['info']
+        sector = next((s for s, tickers in SECTOR_MAPPING.items() if ticker in tickers), 'Other')
+        for date, row in data['prices'].iterrows():
+            rows.append({
+                'Date': date.strftime('%Y-%m-%d'), 'Year': date.year, 'Month': date.month,
+                'Quarter': f"Q{((date.month-1)//3)+1} {date.year}", 'Ticker': ticker,
+                'Company_Name': info.get('longName', ticker), 'Sector': sector,
+                'Industry': info.get('industry', 'Unknown'), 'Market_Cap_Billions': info.get('marketCap', 0) / 1e9,
+                'Open': round(row['Open'], 2), 'High': round(row['High'], 2), 'Low': round(row['Low'], 2),
+                'Close': round(row['Close'], 2), 'Volume': int(row['Volume']),
+                'Daily_Return_Pct': round(row.get('Returns', 0) * 100, 4), 'MA_20': round(row.get('MA_20', 0), 2),
+                'MA_50': round(row.get('MA_50', 0), 2), 'RSI': round(row.get('RSI', 0), 2)
+            })
+    return pd.DataFrame(rows)[MASTER_COLUMNS]
+
+
+@pytest.mark.parametrize('chunk_rows', [250_000, 97])
+def test_master_table_matches_the_row_by_row_export(tmp_path, chunk_rows):
+
+    stock_data = make_stock_data(days=120)
+    filepath = tmp_path / 'bi_master_data.csv'
+    assert write_master_table(stock_data, str(filepath), chunk_rows) == 4 * 120
+
+    written = pd.read_csv(filepath)
+    expected = pd.read_csv(io.StringIO(reference_master_rows(stock_data).to_csv(index=False)))
+    pd.testing.assert_frame_equal(written, expected, rtol=1e-9)
+
+
+def read_dataset(dataset_dir) -> pd.DataFrame:
+    import pyarrow.dataset as ds
+    return ds.dataset(str(dataset_dir), format='parquet', partitioning='hive').to_table().to_pandas()
+
+
+def test_parquet_appends_only_new_bars(tmp_path):
+    pytest.importorskip('pyarrow')
+    from src.export_for_bi import write_master_parquet
+
+    full = make_stock_data(days=300)                    # 2023-01-02 onwards, so the dataset spans two years
+    first = {t: dict(d, prices=d['prices'].iloc[:250]) for t, d in full.items()}
+    dataset_dir = tmp_path / 'bi_master_data'
+
+    assert write_master_parquet(first, str(dataset_dir)) == 4 * 250
+    assert write_master_parquet(first, str(dataset_dir)) == 0          # nothing new: no rows, no rewrites
+    assert write_master_parquet(full, str(dataset_dir)) == 4 * 50
+
+    table = read_dataset(dataset_dir)
+    assert len(table) == 4 * 300
+    assert not table.duplicated(['Ticker', 'Date']).any()
+    assert sorted(p.name for p in dataset_dir.iterdir()) == ['Year=2023', 'Year=2024', '_manifest.json']
+
+    with open(dataset_dir / '_manifest.json') as f:
+        manifest = json.load(f)['last_date']
+    last = full['AAPL']['prices'].index[-1].strftime('%Y-%m-%d')
+    assert manifest == {ticker: last for ticker in full}
+
+
+def test_parquet_reexport_after_lost_manifest_does_not_duplicate(tmp_path):
+    pytest.importorskip('pyarrow')
+    from src.export_for_bi import write_master_parquet
+
+    stock_data = make_stock_data(days=120)
+    dataset_dir = tmp_path / 'bi_master_data'
+    write_master_parquet(stock_data, str(dataset_dir))
+    (dataset_dir / '_manifest.json').unlink()             # e.g. a crash before the first checkpoint
+
+    write_master_parquet(stock_data, str(dataset_dir))
+    table = read_dataset(dataset_dir)
+    assert len(table) == 4 * 120 and not table.duplicated(['Ticker', 'Date']).any()
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_stock_data
+from src.dashboard_state import DataSnapshot
+from src.factor_model import FactorModel
+
+
+def factor_returns(days: int = 300, tickers: int = 200, k: int = 3, seed: int = 0) -> pd.DataFrame:     # k true factors plus noise
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(days, k)) @ rng.normal(size=(k, tickers)) * 0.01 + rng.normal(size=(days, tickers)) * 0.005
+    return pd.DataFrame(values, index=pd.bdate_range('2024-01-01', periods=days), columns=[f'T{i}' for i in range(tickers)])
+
+
+def test_roll_matches_a_fresh_fit_of_the_shifted_window():
+
+    returns = factor_returns()
+    rolled = FactorModel(returns.iloc[:252], k=3).roll(returns.iloc[5:257], 252)
+    fresh = FactorModel(returns.iloc[5:257], k=3)
+
+    assert rolled.returns.index.equals(fresh.returns.index)
+    np.testing.assert_allclose(rolled.total_risk, fresh.total_risk, rtol=1e-4)
+    np.testing.assert_allclose(rolled.portfolio_volatility(np.full(200, 1 / 200)),
+                               fresh.portfolio_volatility(np.full(200, 1 / 200)), rtol=1e-4)
+
+
+def test_reload_warm_starts_the_factor_model():
+
+    full = make_stock_data(days=400)
+    window = lambda start, stop: {t: dict(d, prices=d['prices'].iloc[start:stop]) for t, d in full.items()}
+    previous = DataSnapshot(window(0, 380))
+    previous.warm()
+
+    snapshot = DataSnapshot(window(3, 383), previous=previous)
+    rolled = snapshot.processor._factor_models[(5, 252)]            # in place before warm() asks for it
+    assert rolled is snapshot.processor.fit_factor_model()
+    assert rolled.returns.index[-1] == full['AAPL']['prices'].index[382]
+
+    changed = {t: d for t, d in window(3, 383).items() if t != 'XOM'}
+    assert DataSnapshot(changed, previous=previous).processor._factor_models == {}
@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+
+from conftest import make_stock_data
+from src.data_processing import FinancialDataProcessor
+
+
+def make_processor(tmp_path) -> FinancialDataProcessor:
+    processor = FinancialDataProcessor(make_stock_data(days=400))
+    processor.processed_data_path = str(tmp_path)
+    return processor
+
+
+def test_garch_params_cover_later_ticker_lists(tmp_path):
+
+    processor = make_processor(tmp_path)
+    assert list(processor.fit_garch_models(tickers=['AAPL'], max_workers=1).index) == ['AAPL']
+    assert not os.path.exists(tmp_path / 'garch')          # only whole-universe fits are persisted
+
+    params = processor.fit_garch_models(tickers=['MSFT', 'AAPL'], max_workers=1)
+    assert list(params.index) == ['MSFT', 'AAPL']
+    assert list(processor.fit_garch_models(max_workers=1).index) == ['AAPL', 'MSFT', 'JPM', 'XOM']
+    assert [name.endswith('.csv') for name in os.listdir(tmp_path / 'garch')] == [True]
+    assert list(processor.fit_garch_models(tickers=['JPM']).index) == ['JPM']
+
+
+def test_garch_params_are_reloaded_for_the_same_data_version(tmp_path):
+
+    fitted = make_processor(tmp_path).fit_garch_models(max_workers=1)
+    reloaded = make_processor(tmp_path)
+    reloaded._fit_garch = None                              # any refit would fail
+    params = reloaded.fit_garch_models(tickers=['JPM', 'XOM'])
+    pd.testing.assert_frame_equal(params, fitted.loc[['JPM', 'XOM']])
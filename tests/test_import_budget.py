@@ -0,0 +1,11 @@
+import pytest
+
+from src.cli import BENCH_MODULES, measure_import
+
+
+@pytest.mark.parametrize('module', BENCH_MODULES)
+def test_cold_import_is_lazy_and_side_effect_free(module):      # timings are reported by `python -m src bench`, not gated here
+
+    result = measure_import(module, repeat=1)
+    assert result['loaded'] == [], f"src.{module} eagerly imports {', '.join(result['loaded'])}"
+    assert result['created'] == [], f"src.{module} creates {', '.join(result['created'])} on import"
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.intraday import IntradayStore
+
+
+def make_minute_bars(day: str, minutes: int = 390) -> pd.DataFrame:     # one regular session of 1m bars in exchange time
+    index = pd.date_range(f'{day} 09:30', periods=minutes, freq='min', tz='America/New_York')
+    close = 100 + np.cumsum(np.full(minutes, 0.01))
+    return pd.DataFrame({'Open': close, 'High': close + 0.05, 'Low': close - 0.05, 'Close': close,
+                         'Volume': 1000}, index=index)
+
+
+def test_write_and_read_sessions(tmp_path):
+
+    store = IntradayStore(str(tmp_path), '1m')
+    bars = pd.concat([make_minute_bars('2024-01-03'), make_minute_bars('2024-01-04')])
+    assert store.write('AAPL', bars) == 2
+    assert store.days('AAPL') == [20240103, 20240104]
+
+    frame = store.read_sessions('AAPL', 1)
+    assert len(frame) == 390
+    assert frame.index[0] == pd.Timestamp('2024-01-04 09:30', tz='America/New_York')
+
+    daily = store.daily_bars('AAPL')
+    assert list(daily['Volume']) == [390_000, 390_000]
+
+
+def test_rewrite_keeps_one_bar_per_timestamp(tmp_path):
+
+    store = IntradayStore(str(tmp_path), '1m')
+    store.write('AAPL', make_minute_bars('2024-01-03', 200))
+    store.write('AAPL', make_minute_bars('2024-01-03'))
+    assert len(store.read('AAPL', '2024-01-03', '2024-01-03')) == 390
+    assert store.daily_bars('AAPL')['Volume'].iloc[0] == 390_000
+
+
+def test_stray_temp_files_are_not_sessions(tmp_path):      # left behind by a crashed or in-flight write
+
+    store = IntradayStore(str(tmp_path), '1m')
+    store.write('AAPL', make_minute_bars('2024-01-03'))
+    directory = tmp_path / '1m' / 'AAPL'
+    for name in ['20240104.npy.999.tmp', '20240104.npy.999.tmp.npy', '_daily.npy.999.tmp']:
+        (directory / name).write_bytes(b'partial')
+
+    assert store.days('AAPL') == [20240103]
+    assert len(store.read_sessions('AAPL')) == 390
+    assert sorted(p.name for p in directory.iterdir() if 'tmp' not in p.name) == ['20240103.npy', '_daily.npy']
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_stock_data
+from src.panel import PricePanel
+from src.range_stats import STAT_COLUMNS, RangeStatsIndex
+
+
+@pytest.fixture(scope='module')
+def universe():         # uneven universe: JPM misses a block of bars, XOM has scattered missing returns
+    stock_data = make_stock_data(days=260)
+    stock_data['JPM']['prices'] = stock_data['JPM']['prices'].drop(stock_data['JPM']['prices'].index[100:130])
+    stock_data['XOM']['prices'].iloc[::17, stock_data['XOM']['prices'].columns.get_loc('Returns')] = np.nan
+    panel = PricePanel.from_stock_data(stock_data)
+    return panel, RangeStatsIndex.from_panel(panel)
+
+
+@pytest.mark.parametrize('window', [5, 20, 63])
+def test_window_stats_match_pandas_rolling(universe, window):
+
+    panel, index = universe
+    returns, close = panel.field_frame('Returns'), panel.field_frame('Close')
+    mean = returns.rolling(window, min_periods=1).mean()
+    std = returns.rolling(window, min_periods=2).std()
+    high = close.rolling(window, min_periods=1).max()
+    low = close.rolling(window, min_periods=1).min()
+
+    for ticker in panel.tickers:
+        for j in range(window, len(panel.dates) + 1, 7):
+            stats = index.window_stats(ticker, j - window, j)
+            row = j - 1
+            np.testing.assert_allclose(stats['mean_return'], mean[ticker].iloc[row], rtol=1e-9, atol=1e-12)
+            np.testing.assert_allclose(stats['volatility'], std[ticker].iloc[row], rtol=1e-6, atol=1e-12)
+            np.testing.assert_allclose(index.high_low(ticker, j - window, j), (high[ticker].iloc[row], low[ticker].iloc[row]))
+
+            bars = close[ticker].iloc[j - window:j].dropna()
+            expected = bars.iloc[-1] / bars.iloc[0] - 1 if len(bars) else np.nan
+            np.testing.assert_allclose(stats['total_return'], expected, rtol=1e-9)
+
+
+def test_date_windows_and_tails(universe):
+
+    panel, index = universe
+    prices = panel.ticker_frame('JPM', trim=True)
+    start, end = prices.index[40], prices.index[150]
+    stats = index.stats(['JPM'], start.date(), end.date()).loc['JPM']
+    expected = prices.loc[start:end, 'Returns']
+    assert stats['observations'] == expected.count()
+    np.testing.assert_allclose(stats['annual_return'], expected.mean() * 252)
+
+    tail = index.stats(['JPM'], last_rows=90).loc['JPM']            # 90 of JPM's own bars, across its gap
+    np.testing.assert_allclose(tail['total_return'], prices['Close'].iloc[-1] / prices['Close'].iloc[-90] - 1)
+
+
+def test_empty_selection_returns_no_rows(universe):
+    _, index = universe
+    assert list(index.stats([]).columns) == STAT_COLUMNS and index.stats([]).empty
+    assert list(index.stats(None).index) == index.tickers
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from conftest import make_stock_data
+from src.refresh import MarketCalendar, RefreshScheduler
+
+TZ = 'America/New_York'
+
+
+def at(when: str) -> pd.Timestamp:
+    return pd.Timestamp(when, tz=TZ)
+
+
+@pytest.mark.parametrize('day', ['2024-01-01', '2024-01-15', '2024-02-19', '2024-03-29', '2024-05-27', '2024-06-19',
+                                 '2024-07-04', '2024-09-02', '2024-11-28', '2024-12-25',
+                                 '2022-12-26',          # Christmas on a Sunday, observed Monday
+                                 '2027-06-18'])         # Juneteenth on a Saturday, observed Friday
+def test_nyse_holidays_are_closed(day):
+    assert not MarketCalendar().is_trading_day(pd.Timestamp(day))
+
+
+@pytest.mark.parametrize('day', ['2021-12-31',          # New Year on a Saturday is not moved back
+                                 '2021-06-18',          # Juneteenth only from 2022
+                                 '2024-07-03', '2024-11-29', '2024-12-24'])     # early closes are trading days
+def test_trading_days(day):
+    assert MarketCalendar().is_trading_day(pd.Timestamp(day))
+
+
+def test_2024_has_252_sessions():
+    calendar = MarketCalendar()
+    assert sum(calendar.is_trading_day(day) for day in pd.date_range('2024-01-01', '2024-12-31')) == 252
+
+
+def test_last_session_and_next_close():
+    calendar = MarketCalendar()
+    assert calendar.last_session(at('2024-09-02 18:00')) == pd.Timestamp('2024-08-30')     # Labor Day
+    assert calendar.last_session(at('2024-09-03 15:59')) == pd.Timestamp('2024-08-30')     # before the bell
+    assert calendar.last_session(at('2024-09-03 16:00')) == pd.Timestamp('2024-09-03')
+    assert calendar.next_close(at('2024-11-27 16:00')) == at('2024-11-29 16:00')           # skips Thanksgiving
+
+
+def test_next_run_after_an_early_close_waits_for_the_regular_close_plus_settle():
+    scheduler = RefreshScheduler(publisher=object(), collect=dict, settle_minutes=30, jitter_seconds=0)
+    assert scheduler.next_run(at('2024-11-27 16:29')) == at('2024-11-27 16:30')
+    assert scheduler.next_run(at('2024-11-27 16:31')) == at('2024-11-29 16:30')      # 13:00 close, settled by 16:30
+    assert scheduler.next_run(at('2024-12-24 16:45')) == at('2024-12-26 16:30')
+
+
+class RecordingPublisher:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, stock_data, version):
+        self.published.append(version)
+
+
+def test_refresh_once_publishes_only_fresh_changed_data():
+
+    stock_data = make_stock_data(days=300)                      # last bar 2024-02-23
+    publisher = RecordingPublisher()
+    scheduler = RefreshScheduler(publisher=publisher, collect=lambda: stock_data)
+
+    assert scheduler.refresh_once(at('2024-02-26 17:00')) is None          # Monday's session not in the data yet
+    version = scheduler.refresh_once(at('2024-02-24 12:00'))
+    assert scheduler.refresh_once(at('2024-02-24 13:00')) == version
+    assert publisher.published == [version]
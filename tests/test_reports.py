@@ -0,0 +1,23 @@
+import os
+import pickle
+
+from conftest import make_stock_data
+from src.visualization_utils import BatchReportRenderer
+
+
+def test_render_isolates_failed_charts(tmp_path):
+
+    data_path = tmp_path / 'stock_data.pkl'
+    with open(data_path, 'wb') as f:
+        pickle.dump(make_stock_data({'AAPL': 'Technology', 'MSFT': 'Technology'}, days=60), f)
+    output_dir = str(tmp_path / 'reports')
+    renderer = BatchReportRenderer(output_dir, str(data_path), mode='preview', max_workers=2)
+
+    timings, failures = renderer.render(['AAPL', 'NOPE', 'MSFT'])
+    assert set(failures) == {'price_NOPE.png', 'returns_NOPE.png'}
+    assert set(timings) == {'price_AAPL.png', 'returns_AAPL.png', 'price_MSFT.png', 'returns_MSFT.png'}
+    with open(os.path.join(output_dir, BatchReportRenderer.MANIFEST)) as f:
+        assert sorted(f.read().split()) == sorted(timings)
+
+    timings, failures = renderer.render(['AAPL', 'NOPE', 'MSFT'])      # resume: only the failed charts are retried
+    assert timings == {} and set(failures) == {'price_NOPE.png', 'returns_NOPE.png'}
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import src.resampling as resampling
+from conftest import make_stock_data
+from src.resampling import FREQUENCIES, ResamplingEngine
+
+FULL = make_stock_data(days=700)
+
+
+def engine_over(start: int, stop: int, revised: int = 0) -> ResamplingEngine:     # bars [start, stop), first `revised` rows rescaled
+    stock_data = {}
+    for ticker, data in FULL.items():
+        prices = data['prices'].iloc[start:stop].copy()
+        prices.iloc[:revised, prices.columns.get_indexer(['Open', 'High', 'Low', 'Close'])] *= 0.99
+        stock_data[ticker] = dict(data, prices=prices)
+    return ResamplingEngine.from_stock_data(stock_data)
+
+
+def warmed(engine: ResamplingEngine) -> ResamplingEngine:
+    for freq in FREQUENCIES:
+        engine.get(freq)
+    return engine
+
+
+def assert_same_bars(engine: ResamplingEngine, expected: ResamplingEngine):
+    for freq in FREQUENCIES:
+        for field, frame in expected.get(freq).items():
+            pd.testing.assert_frame_equal(engine.get(freq)[field], frame, obj=f'{freq} {field}')
+
+
+@pytest.mark.parametrize('start, stop, revised', [
+    (0, 520, 0),            # appended bars
+    (5, 510, 0),            # rolling window: oldest bars dropped, new ones appended
+    (23, 540, 0),           # window start moved into a later month
+    (5, 510, 300),          # dividend adjustment rewrote older bars
+    (5, 510, 505),          # ... or all of them
+    (0, 500, 0)             # nothing new
+])
+def test_extend_matches_a_fresh_build(start, stop, revised):
+    extended = warmed(engine_over(0, 500)).extend(engine_over(start, stop, revised).daily)
+    assert_same_bars(extended, engine_over(start, stop, revised))
+
+
+def test_extend_reaggregates_only_the_edges_of_a_shifted_window(monkeypatch):
+
+    old = warmed(engine_over(0, 500))
+    rows = {}
+    aggregate = resampling._aggregate
+    monkeypatch.setattr(resampling, '_aggregate',
+                        lambda daily, rule: rows.setdefault(rule, []).append(len(daily['Close'])) or aggregate(daily, rule))
+    old.extend(engine_over(5, 510).daily)
+
+    for freq in ['W', 'M', 'Q']:            # the period that lost bars off the front and the open ones, not the window
+        assert sum(rows[FREQUENCIES[freq]]) < 150, (freq, rows[FREQUENCIES[freq]])
+
+
+def test_extend_rejects_a_different_universe():
+    old = warmed(engine_over(0, 500))
+    daily = {field: frame.drop(columns='XOM') for field, frame in engine_over(0, 510).daily.items()}
+    assert old.extend(daily) is None
+    assert old.extend(engine_over(0, 400).daily) is None        # truncated history
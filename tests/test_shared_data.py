@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_stock_data
+from src.dashboard_state import DataSnapshot
+from src.shared_data import SHARED_FIELDS, SharedDataPublisher, SharedDataReader
+
+
+def test_published_version_round_trips(tmp_path):
+
+    stock_data = make_stock_data(days=120)
+    version = SharedDataPublisher(str(tmp_path)).publish(stock_data)
+    dataset = SharedDataReader(str(tmp_path)).attach()
+
+    assert dataset.version == version
+    assert isinstance(dataset.values, np.memmap) and not dataset.values.flags.writeable
+    restored = dataset.to_stock_data()
+    for ticker, data in stock_data.items():
+        expected = data['prices'][SHARED_FIELDS].astype('float64')
+        pd.testing.assert_frame_equal(restored[ticker]['prices'], expected, check_names=False, check_index_type=False)
+        assert restored[ticker]['prices'].index.equals(expected.index)
+        assert restored[ticker]['sector'] == data['sector']
+
+
+def test_reader_follows_current_and_old_versions_are_pruned(tmp_path):
+
+    publisher, reader = SharedDataPublisher(str(tmp_path), keep_versions=2), SharedDataReader(str(tmp_path))
+    publisher.publish(make_stock_data(days=100, seed=1))
+    first = reader.attach()
+    assert reader.attach() is first and not reader.has_update()        # mapping reused while CURRENT is unchanged
+
+    for seed in (2, 3):
+        publisher.publish(make_stock_data(days=100, seed=seed))
+    assert reader.has_update()
+    latest = reader.attach()
+    assert latest.version != first.version
+    assert len(list((tmp_path / 'versions').iterdir())) == 2
+    assert first.field('Close').sum() > 0                                # an attached mapping survives the unlink
+
+
+def test_snapshot_serves_views_into_the_shared_panel(tmp_path):
+
+    SharedDataPublisher(str(tmp_path)).publish(make_stock_data(days=120))
+    snapshot = DataSnapshot(SharedDataReader(str(tmp_path)).attach())
+    assert np.shares_memory(snapshot.master_df.to_numpy(), snapshot.panel.values)
+    assert np.shares_memory(snapshot.stock_data['AAPL']['prices'].to_numpy(), snapshot.panel.values)
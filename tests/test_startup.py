@@ -0,0 +1,61 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+from conftest import make_stock_data
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+FIRST_RESPONSE_BUDGET_S = 5.0
+
+# Import the app in a fresh interpreter (as a server process would), answer one request
+# through the Flask test client as soon as the import returns, then wait for warm-up.
+_STARTUP_PROBE = """
+import importlib.util, json, time
+spec = importlib.util.spec_from_file_location('dash_app', {app_path!r})
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+client = app.server.test_client()
+health = client.get('/healthz')
+deadline = time.time() + 120
+while not app.state.ready and app.state.phase != 'failed' and time.time() < deadline:
+    time.sleep(0.05)
+ready = client.get('/readyz')
+print(json.dumps(dict(health_status=health.status_code, ready_status=ready.status_code, ready=ready.get_json())))
+"""
+
+
+def _start_app(data_dir: str, cwd) -> dict:
+
+    app_path = os.path.join(PROJECT_ROOT, 'dashboards', 'dash_app', 'app.py')
+    env = dict(os.environ, MARKET_DATA_DIR=data_dir, DASHBOARD_STARTUP_MODE='background',
+               DASHBOARD_COLLECT_IF_MISSING='0', DASHBOARD_RELOAD_INTERVAL='0')
+    result = subprocess.run([sys.executable, '-c', _STARTUP_PROBE.format(app_path=app_path)], cwd=cwd,
+                            env=env, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_first_response_is_served_before_warmup(market_data_dir, tmp_path):
+
+    probe = _start_app(market_data_dir, tmp_path)
+
+    assert probe['health_status'] == 200
+    assert probe['ready_status'] == 200, probe['ready']
+    timings = probe['ready']['timings_s']
+    assert timings['first_response'] < FIRST_RESPONSE_BUDGET_S
+    assert timings['first_response'] < timings['caches_warm']
+
+
+def test_warmup_without_default_risk_stocks(tmp_path):     # none of the Risk Analysis defaults in the universe
+
+    raw = tmp_path / 'data' / 'raw'
+    raw.mkdir(parents=True)
+    with open(raw / 'stock_data.pkl', 'wb') as f:
+        pickle.dump(make_stock_data({'MSFT': 'Technology', 'JPM': 'Financial'}), f)
+
+    probe = _start_app(str(tmp_path / 'data'), tmp_path)
+    assert probe['ready_status'] == 200, probe['ready']
+    assert probe['ready']['phase'] == 'ready'
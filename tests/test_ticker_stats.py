@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from conftest import FIXTURE_TICKERS, make_stock_data
+from src.data_processing import ANALYSIS_PERIODS, PERIOD_RETURN_WINDOWS, FinancialDataProcessor
+
+
+@pytest.fixture(scope='module')
+def stock_data():
+    return make_stock_data(days=300)
+
+
+def test_ticker_stats_match_per_ticker_pandas(stock_data):
+
+    stats = FinancialDataProcessor(stock_data).build_ticker_stats()
+    assert list(stats.index) == list(FIXTURE_TICKERS)
+    assert stats['sector'].to_dict() == FIXTURE_TICKERS
+
+    for ticker, data in stock_data.items():
+        prices = data['prices']
+        returns = prices['Returns'].dropna()
+        row = stats.loc[ticker]
+        np.testing.assert_allclose(row['annual_return'], returns.mean() * 252)
+        np.testing.assert_allclose(row['annual_volatility'], returns.std() * np.sqrt(252))
+        np.testing.assert_allclose(row['sharpe_ratio'], row['annual_return'] / row['annual_volatility'])
+        np.testing.assert_allclose(row['avg_volume'], prices['Volume'].mean())
+
+        for label, window in PERIOD_RETURN_WINDOWS.items():
+            close = prices['Close'].tail(window + 1)
+            np.testing.assert_allclose(row[f'return_{label}'], close.iloc[-1] / close.iloc[0] - 1)
+        for period in ANALYSIS_PERIODS[:-1]:
+            recent = prices['Returns'].tail(period).dropna()
+            np.testing.assert_allclose(row[f'annual_volatility_{period}d'], recent.std() * np.sqrt(252))
+
+
+def test_ticker_stats_are_built_once(stock_data):
+    processor = FinancialDataProcessor(stock_data)
+    assert processor.build_ticker_stats() is processor.build_ticker_stats()